@@ -1,78 +1,134 @@
 import os
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+@dataclass(frozen=True, slots=True)
 class Settings:
     """
     Centralized configuration management for the Telegram Intelligence Bot.
 
-    This class loads all configuration from environment variables and provides
-    typed access to application settings. It also defines the channel routing rules.
+    This class provides typed, read-only access to application settings and
+    defines the channel routing rules. Environment variables are resolved once
+    by `Settings.from_env()`; the instance is frozen and slotted, so every
+    `settings.FOO` read is a plain slot access.
     """
 
-    def __init__(self):
-        # Base directories
-        self.BASE_DIR = Path(__file__).parent.parent
-        self.TEMP_DIR = Path(os.getenv('TEMP_DIR', './temp'))
-        self.TEMP_DIR.mkdir(exist_ok=True)
-
-        # Telegram Configuration
-        self.TELEGRAM_API_ID = int(os.getenv('TELEGRAM_API_ID', '0'))
-        self.TELEGRAM_API_HASH = os.getenv('TELEGRAM_API_HASH', '')
-        self.TELEGRAM_PHONE = os.getenv('TELEGRAM_PHONE', '')
-        self.SESSION_NAME = os.getenv('SESSION_NAME', 'yaronotifs_session')
-
-        # Output Destinations
-        # OUTPUT_CHANNEL_ID: Default/fallback output channel (kept for backward compatibility)
-        self.OUTPUT_CHANNEL_ID = os.getenv('OUTPUT_CHANNEL_ID', '')
-
-        # Smart Channel Routing: Route messages to different output channels based on source
-        self.CRYPTO_OUTPUT_CHANNEL = os.getenv('CRYPTO_OUTPUT_CHANNEL', '@cryptonotifs')
-        self.EQUITIES_OUTPUT_CHANNEL = os.getenv('EQUITIES_OUTPUT_CHANNEL', '@equitiesnotifs')
-
-        # STATUS_DESTINATION_ID: Optional - where bot metrics/status reports are sent
-        # Can be a user ID or channel ID. Leave empty to disable status reports.
-        self.STATUS_DESTINATION_ID = os.getenv('STATUS_DESTINATION_ID', '')
-
-        # AI Configuration
-        self.GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
-        self.GEMINI_MODEL = 'models/gemini-2.5-flash'
-
-        # Application Settings
-        self.LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-
-        # Channel Definitions
-        # All channels are processed through the UnifiedPipeline
-        # The LLM intelligently determines what processing is needed
-        self.MONITORED_CHANNELS: List[int] = [
-            -1001279597711,    # BWEnews (Chinese news)
-            -1001526765830,    # Foresight News (Chinese news)
-            -1001750561680,    # DTpapers (Equity research PDFs)
-            -1003309883285,    # Yaro Notifs [Test Channel]
-        ]
-
-        # Channel Routing Map: Maps source channel IDs to output channels
+    # Base directories
+    BASE_DIR: Path = Path(__file__).parent.parent
+    TEMP_DIR: Path = Path('./temp')
+
+    # Telegram Configuration
+    TELEGRAM_API_ID: int = 0
+    TELEGRAM_API_HASH: str = ''
+    TELEGRAM_PHONE: str = ''
+    SESSION_NAME: str = 'yaronotifs_session'
+
+    # Output Destinations
+    # OUTPUT_CHANNEL_ID: Default/fallback output channel (kept for backward compatibility)
+    OUTPUT_CHANNEL_ID: str = ''
+
+    # Smart Channel Routing: Route messages to different output channels based on source
+    CRYPTO_OUTPUT_CHANNEL: str = '@cryptonotifs'
+    EQUITIES_OUTPUT_CHANNEL: str = '@equitiesnotifs'
+
+    # STATUS_DESTINATION_ID: Optional - where bot metrics/status reports are sent
+    # Can be a user ID or channel ID. Leave empty to disable status reports.
+    STATUS_DESTINATION_ID: str = ''
+
+    # AI Configuration
+    GEMINI_API_KEY: str = ''
+    GEMINI_MODEL: str = 'models/gemini-2.5-flash'
+    GEMINI_MAX_CONCURRENCY: int = 8  # Gemini requests in flight per pipeline
+    GEMINI_REQUEST_TIMEOUT: int = 15  # seconds per text request attempt
+    GEMINI_DOCUMENT_TIMEOUT: int = 60  # seconds per document request attempt
+    LLM_CACHE_PATH: Path = Path('./llm_cache.db')  # persistent Gemini response cache
+
+    # Application Settings
+    LOG_LEVEL: str = 'INFO'
+    ENABLE_DAILY_SUMMARY: bool = True  # post the scheduled daily digest
+    ENABLE_ROW_MARSHALING: bool = False  # batch short texts into one Gemini prompt
+    ENABLE_PDF_COMPACTION: bool = False  # downsample large PDFs before sending to Gemini
+
+    # Channel Definitions
+    # All channels are processed through the UnifiedPipeline
+    # The LLM intelligently determines what processing is needed
+    # The tuple keeps declaration order for registration/logging; the
+    # frozenset is used for O(1) membership checks on incoming messages.
+    MONITORED_CHANNELS_TUPLE: Tuple[int, ...] = (
+        -1001279597711,    # BWEnews (Chinese news)
+        -1001526765830,    # Foresight News (Chinese news)
+        -1001750561680,    # DTpapers (Equity research PDFs)
+        -1003309883285,    # Yaro Notifs [Test Channel]
+    )
+    MONITORED_CHANNELS: FrozenSet[int] = field(init=False)
+
+    # Channel Routing Map: Maps source channel IDs to output channels
+    # Built in __post_init__ from the output channel settings above
+    CHANNEL_ROUTING: Mapping[int, str] = field(init=False)
+
+    # Retry Configuration
+    MAX_RETRIES: int = 3
+    RETRY_DELAY: int = 2  # seconds
+    BACKOFF_MULTIPLIER: int = 2
+
+    # File Processing Limits
+    MAX_PDF_SIZE_MB: int = 50
+    REQUEST_TIMEOUT: int = 60  # seconds
+
+    # Concurrency Limits
+    MAX_CONCURRENT_MESSAGES: int = 8  # messages processed in parallel
+    MESSAGE_QUEUE_SIZE: int = 1024  # incoming messages buffered before dropping
+
+    def __post_init__(self):
+        # Frozen dataclass: derived fields must be set via object.__setattr__
+        object.__setattr__(self, 'MONITORED_CHANNELS', frozenset(self.MONITORED_CHANNELS_TUPLE))
+
         # This enables smart routing where crypto news goes to crypto channel
         # and equity research goes to equities channel
-        self.CHANNEL_ROUTING: Dict[int, str] = {
+        object.__setattr__(self, 'CHANNEL_ROUTING', MappingProxyType({
             -1001279597711: self.CRYPTO_OUTPUT_CHANNEL,    # BWEnews → Crypto
             -1001526765830: self.CRYPTO_OUTPUT_CHANNEL,    # Foresight News → Crypto
             -1001750561680: self.EQUITIES_OUTPUT_CHANNEL,  # DTpapers → Equities
             -1003309883285: self.CRYPTO_OUTPUT_CHANNEL,    # Test Channel → Crypto (for testing)
-        }
+        }))
 
-        # Retry Configuration
-        self.MAX_RETRIES = 3
-        self.RETRY_DELAY = 2  # seconds
-        self.BACKOFF_MULTIPLIER = 2
+    @classmethod
+    def from_env(cls) -> 'Settings':
+        """
+        Build settings from environment variables.
 
-        # File Processing Limits
-        self.MAX_PDF_SIZE_MB = 50
-        self.REQUEST_TIMEOUT = 60  # seconds
+        Returns:
+            Settings: Frozen settings instance
+        """
+        temp_dir = Path(os.getenv('TEMP_DIR', './temp'))
+        temp_dir.mkdir(exist_ok=True)
+
+        return cls(
+            TEMP_DIR=temp_dir,
+            TELEGRAM_API_ID=int(os.getenv('TELEGRAM_API_ID', '0')),
+            TELEGRAM_API_HASH=os.getenv('TELEGRAM_API_HASH', ''),
+            TELEGRAM_PHONE=os.getenv('TELEGRAM_PHONE', ''),
+            SESSION_NAME=os.getenv('SESSION_NAME', 'yaronotifs_session'),
+            OUTPUT_CHANNEL_ID=os.getenv('OUTPUT_CHANNEL_ID', ''),
+            CRYPTO_OUTPUT_CHANNEL=os.getenv('CRYPTO_OUTPUT_CHANNEL', '@cryptonotifs'),
+            EQUITIES_OUTPUT_CHANNEL=os.getenv('EQUITIES_OUTPUT_CHANNEL', '@equitiesnotifs'),
+            STATUS_DESTINATION_ID=os.getenv('STATUS_DESTINATION_ID', ''),
+            GEMINI_API_KEY=os.getenv('GEMINI_API_KEY', ''),
+            GEMINI_MAX_CONCURRENCY=int(os.getenv('GEMINI_MAX_CONCURRENCY', '8')),
+            GEMINI_REQUEST_TIMEOUT=int(os.getenv('GEMINI_REQUEST_TIMEOUT', '15')),
+            GEMINI_DOCUMENT_TIMEOUT=int(os.getenv('GEMINI_DOCUMENT_TIMEOUT', '60')),
+            LLM_CACHE_PATH=Path(os.getenv('LLM_CACHE_PATH', './llm_cache.db')),
+            LOG_LEVEL=os.getenv('LOG_LEVEL', 'INFO'),
+            ENABLE_DAILY_SUMMARY=os.getenv('ENABLE_DAILY_SUMMARY', 'true').lower() in ('1', 'true', 'yes'),
+            ENABLE_ROW_MARSHALING=os.getenv('ENABLE_ROW_MARSHALING', 'false').lower() in ('1', 'true', 'yes'),
+            ENABLE_PDF_COMPACTION=os.getenv('ENABLE_PDF_COMPACTION', 'false').lower() in ('1', 'true', 'yes'),
+        )
 
     def validate(self) -> bool:
         """
@@ -81,25 +137,20 @@ class Settings:
         Returns:
             bool: True if configuration is valid, raises ValueError otherwise
         """
-        errors = []
-
-        if not self.TELEGRAM_API_ID or self.TELEGRAM_API_ID == 0:
-            errors.append("TELEGRAM_API_ID is required")
-
-        if not self.TELEGRAM_API_HASH:
-            errors.append("TELEGRAM_API_HASH is required")
-
-        if not self.TELEGRAM_PHONE:
-            errors.append("TELEGRAM_PHONE is required")
-
-        if not self.OUTPUT_CHANNEL_ID:
-            errors.append("OUTPUT_CHANNEL_ID is required")
-
-        if not self.GEMINI_API_KEY:
-            errors.append("GEMINI_API_KEY is required")
-
-        if errors:
-            raise ValueError(f"Configuration validation failed:\n" + "\n".join(f"  - {e}" for e in errors))
+        required = (
+            ('TELEGRAM_API_ID', self.TELEGRAM_API_ID),
+            ('TELEGRAM_API_HASH', self.TELEGRAM_API_HASH),
+            ('TELEGRAM_PHONE', self.TELEGRAM_PHONE),
+            ('OUTPUT_CHANNEL_ID', self.OUTPUT_CHANNEL_ID),
+            ('GEMINI_API_KEY', self.GEMINI_API_KEY),
+        )
+        missing = [name for name, value in required if not value]
+
+        if missing:
+            raise ValueError(
+                "Configuration validation failed:\n"
+                + "\n".join(f"  - {name} is required" for name in missing)
+            )
 
         return True
 
@@ -133,4 +184,4 @@ class Settings:
 
 
 # Global settings instance
-settings = Settings()
+settings = Settings.from_env()
@@ -1,5 +1,6 @@
 import asyncio
-from typing import Dict
+from types import MappingProxyType
+from typing import Mapping
 from telethon.tl.types import Message
 
 from config import settings
@@ -9,6 +10,14 @@ from utils import get_logger
 
 logger = get_logger(__name__)
 
+_STATUS_TEMPLATE = (
+    "**📊 Bot Status Report**\n\n"
+    "**Messages Received:** {total_messages}\n"
+    "**Successfully Processed:** {processed}\n"
+    "**Errors:** {errors}\n\n"
+    "_Bot is running with UnifiedPipeline architecture_\n"
+)
+
 
 class MessageHandler:
     """
@@ -38,12 +47,15 @@ class MessageHandler:
         self.client = telegram_client
         self.output_channel_id = settings.OUTPUT_CHANNEL_ID
         self.status_destination_id = settings.STATUS_DESTINATION_ID
+        self.monitored_channels = list(settings.MONITORED_CHANNELS_TUPLE)
 
         # Initialize unified pipeline
         self.unified_pipeline = UnifiedPipeline(
             client=telegram_client.client,
             output_channel_id=self.output_channel_id
         )
+        # Bound once so the per-message path skips the attribute chain
+        self._pipeline_process = self.unified_pipeline.process
 
         # Initialize status reporter
         self.status_reporter = StatusReporter(
@@ -57,6 +69,11 @@ class MessageHandler:
             'processed': 0,
             'errors': 0
         }
+        self._metrics_view = MappingProxyType(self.metrics)
+
+        # Caps in-flight pipeline work so message bursts queue up instead
+        # of all hitting Gemini/Telegram at once
+        self._concurrency = asyncio.Semaphore(settings.MAX_CONCURRENT_MESSAGES)
 
         logger.info("MessageHandler initialized with UnifiedPipeline")
 
@@ -66,15 +83,15 @@ class MessageHandler:
 
         This sets up event listeners that route messages to the handle_message method.
         """
-        all_channels = settings.MONITORED_CHANNELS
+        all_channels = self.monitored_channels
 
         self.client.on_new_message(
             chat_ids=all_channels,
             handler=self.handle_message
         )
 
-        logger.info(f"✓ Registered handlers for {len(all_channels)} channels")
-        logger.info(f"  - All messages will be processed through UnifiedPipeline")
+        logger.info("✓ Registered handlers for %d channels", len(all_channels))
+        logger.info("  - All messages will be processed through UnifiedPipeline")
 
     async def handle_message(self, message: Message):
         """
@@ -87,44 +104,58 @@ class MessageHandler:
         Args:
             message: Incoming Telegram message
         """
-        self.metrics['total_messages'] += 1
+        metrics = self.metrics
+        metrics['total_messages'] += 1
 
         try:
             # Get channel ID
-            channel_id = message.chat_id if hasattr(message, 'chat_id') else None
+            channel_id = getattr(message, 'chat_id', None)
             if not channel_id:
                 logger.warning("Message has no chat_id, skipping")
                 return
 
             # Log message receipt
-            logger.info(f"📩 New message from channel {channel_id} → UnifiedPipeline")
+            logger.info("📩 New message from channel %s → UnifiedPipeline", channel_id)
 
             # Create a background task for processing
             # This is the KEY to non-blocking concurrency
             asyncio.create_task(self._process_message(message))
 
         except Exception as e:
-            logger.error(f"Error in handle_message: {e}", exc_info=True)
-            self.metrics['errors'] += 1
+            logger.error("Error in handle_message: %s", e, exc_info=True)
+            metrics['errors'] += 1
 
     async def _process_message(self, message: Message):
         """
         Process a message through the UnifiedPipeline.
 
         This runs as an independent task and won't block other messages.
+        At most MAX_CONCURRENT_MESSAGES tasks run the pipeline at once.
         The UnifiedPipeline intelligently determines what processing is needed.
 
         Args:
             message: Telegram message
         """
+        async with self._concurrency:
+            await self._run_pipeline(message)
+
+    async def _run_pipeline(self, message: Message):
+        """
+        Run the UnifiedPipeline for a message and record the outcome.
+
+        Args:
+            message: Telegram message
+        """
+        metrics = self.metrics
+
         try:
-            success = await self.unified_pipeline.process(message)
+            success = await self._pipeline_process(message)
             if success:
-                self.metrics['processed'] += 1
+                metrics['processed'] += 1
                 logger.info("✓ UnifiedPipeline completed")
             else:
                 logger.warning("✗ UnifiedPipeline failed")
-                self.metrics['errors'] += 1
+                metrics['errors'] += 1
                 # Report error to status channel
                 await self.status_reporter.report_error(
                     error_type="UnifiedPipeline Failure",
@@ -133,8 +164,8 @@ class MessageHandler:
                 )
 
         except Exception as e:
-            logger.error(f"Error in unified pipeline: {e}", exc_info=True)
-            self.metrics['errors'] += 1
+            logger.error("Error in unified pipeline: %s", e, exc_info=True)
+            metrics['errors'] += 1
             # Report error to status channel
             await self.status_reporter.report_error(
                 error_type="UnifiedPipeline Exception",
@@ -142,14 +173,18 @@ class MessageHandler:
                 context={"channel_id": message.chat_id}
             )
 
-    def get_metrics(self) -> Dict[str, int]:
+    def get_metrics(self) -> Mapping[str, int]:
         """
         Get processing metrics.
 
+        The returned mapping is a read-only live view of the counters;
+        callers must not (and cannot) mutate it. Copy with dict() if a
+        point-in-time snapshot is needed.
+
         Returns:
-            dict: Dictionary of metrics
+            Mapping: Read-only view of the metrics
         """
-        return self.metrics.copy()
+        return self._metrics_view
 
     async def send_status_report(self):
         """
@@ -164,14 +199,7 @@ class MessageHandler:
             return
 
         try:
-            report = f"""**📊 Bot Status Report**
-
-**Messages Received:** {self.metrics['total_messages']}
-**Successfully Processed:** {self.metrics['processed']}
-**Errors:** {self.metrics['errors']}
-
-_Bot is running with UnifiedPipeline architecture_
-"""
+            report = _STATUS_TEMPLATE.format_map(self.metrics)
             await self.client.send_message(
                 self.status_destination_id,
                 report,
@@ -180,4 +208,4 @@ _Bot is running with UnifiedPipeline architecture_
             logger.info("Status report sent to status destination")
 
         except Exception as e:
-            logger.error(f"Failed to send status report: {e}")
+            logger.error("Failed to send status report: %s", e)
@@ -1,5 +1,7 @@
 import asyncio
 import os
+import random
+import sys
 import time
 from pathlib import Path
 from typing import Optional, Callable, List
@@ -17,8 +19,20 @@ from telethon.tl.types import Message
 from config import settings
 from utils import get_logger
 
+# fcntl is POSIX-only; Windows locks the file with msvcrt instead
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
 logger = get_logger(__name__)
 
+# A connection must survive this long before the reconnect backoff resets
+STABLE_CONNECTION_SECONDS = 60
+
+# Consecutive failed reconnects before giving up
+MAX_RECONNECT_ATTEMPTS = 10
+
 
 class TelegramClientWrapper:
     """
@@ -36,7 +50,8 @@ class TelegramClientWrapper:
         api_id: Optional[int] = None,
         api_hash: Optional[str] = None,
         session_name: Optional[str] = None,
-        phone: Optional[str] = None
+        phone: Optional[str] = None,
+        session_exists: Optional[bool] = None
     ):
         """
         Initialize the Telegram client wrapper.
@@ -46,19 +61,27 @@ class TelegramClientWrapper:
             api_hash: Telegram API hash (defaults to settings)
             session_name: Session file name (defaults to settings)
             phone: Phone number for authentication (defaults to settings)
+            session_exists: Whether the session file exists, if already known
+                (avoids re-checking the filesystem; checked here if None)
         """
-        self.api_id = api_id or settings.TELEGRAM_API_ID
-        self.api_hash = api_hash or settings.TELEGRAM_API_HASH
-        self.session_name = session_name or settings.SESSION_NAME
-        self.phone = phone or settings.TELEGRAM_PHONE
-
-        # Session file path
-        self.session_path = settings.BASE_DIR / f"{self.session_name}.session"
-        self.lock_file = settings.BASE_DIR / f"{self.session_name}.lock"
+        s = settings
+        self.api_id = api_id or s.TELEGRAM_API_ID
+        self.api_hash = api_hash or s.TELEGRAM_API_HASH
+        self.session_name = session_name or s.SESSION_NAME
+        self.phone = phone or s.TELEGRAM_PHONE
+
+        # Session and lock file paths
+        base = s.BASE_DIR / self.session_name
+        self.session_path = base.with_name(f"{base.name}.session")
+        self.lock_file = base.with_name(f"{base.name}.lock")
+        if session_exists is None:
+            session_exists = self.session_path.exists()
+        self._session_exists = session_exists
+        self._lock_fd: Optional[int] = None
 
         # Initialize the client
         self.client = TelegramClient(
-            str(settings.BASE_DIR / self.session_name),
+            str(base),
             self.api_id,
             self.api_hash,
             connection_retries=5,
@@ -70,7 +93,12 @@ class TelegramClientWrapper:
         self._running = False
         self._message_handlers = []
 
-        logger.info(f"TelegramClientWrapper initialized (session: {self.session_name})")
+        # Incoming messages are queued and drained by a fixed pool of workers,
+        # so slow handlers never block Telethon's update dispatch
+        self._msg_queue: asyncio.Queue = asyncio.Queue(maxsize=s.MESSAGE_QUEUE_SIZE)
+        self._workers: List[asyncio.Task] = []
+
+        logger.info("TelegramClientWrapper initialized (session: %s)", self.session_name)
 
     async def start(self, force_login: bool = False) -> bool:
         """
@@ -85,8 +113,8 @@ class TelegramClientWrapper:
         try:
             logger.info("Starting Telegram client...")
 
-            # Check for existing lock file (prevents multiple instances)
-            if self._check_existing_lock():
+            # Take the instance lock (prevents multiple instances)
+            if not self._acquire_lock():
                 logger.error("=" * 60)
                 logger.error("CRITICAL: Another instance of this bot is already running!")
                 logger.error("Running multiple instances with the same session will cause:")
@@ -95,18 +123,16 @@ class TelegramClientWrapper:
                 logger.error("  - Account suspension")
                 logger.error("")
                 logger.error("Please stop the other instance before starting this one.")
-                logger.error(f"Lock file: {self.lock_file}")
+                logger.error("Lock file: %s", self.lock_file)
                 logger.error("=" * 60)
                 return False
 
-            if force_login or not self.session_path.exists():
+            if force_login or not self._session_exists:
                 logger.warning("Session file not found or force_login=True")
                 logger.warning("Please run create_session.py first to authenticate locally")
+                self._release_lock()
                 return False
 
-            # Create lock file to prevent concurrent access
-            self._create_lock_file()
-
             # Connect using existing session
             await self.client.start(phone=self.phone)
 
@@ -114,14 +140,15 @@ class TelegramClientWrapper:
             if not await self.client.is_user_authorized():
                 logger.error("Session file exists but user is not authorized")
                 logger.error("Please delete the session file and run create_session.py again")
-                self._remove_lock_file()
+                self._release_lock()
                 return False
 
             # Get user info
             me = await self.client.get_me()
-            logger.info(f"✓ Connected as: {me.first_name} (@{me.username or 'N/A'})")
+            logger.info("✓ Connected as: %s (@%s)", me.first_name, me.username or 'N/A')
 
             self._running = True
+            self._start_workers()
             return True
 
         except AuthKeyDuplicatedError as e:
@@ -136,11 +163,11 @@ class TelegramClientWrapper:
             logger.error("  3. Only run ONE instance at a time")
             logger.error("  4. DO NOT copy session files between machines")
             logger.error("=" * 60)
-            self._remove_lock_file()
+            self._release_lock()
             return False
         except Exception as e:
-            logger.error(f"Failed to start Telegram client: {e}", exc_info=True)
-            self._remove_lock_file()
+            logger.error("Failed to start Telegram client: %s", e, exc_info=True)
+            self._release_lock()
             return False
 
     async def stop(self):
@@ -149,16 +176,17 @@ class TelegramClientWrapper:
         """
         logger.info("Stopping Telegram client...")
         self._running = False
+        await self._stop_workers()
 
         try:
             if self.client.is_connected():
                 await self.client.disconnect()
             logger.info("✓ Telegram client stopped")
         except Exception as e:
-            logger.error(f"Error during client shutdown: {e}")
+            logger.error("Error during client shutdown: %s", e)
         finally:
-            # Always remove lock file on shutdown
-            self._remove_lock_file()
+            # Always release the instance lock on shutdown
+            self._release_lock()
 
     def is_running(self) -> bool:
         """
@@ -173,64 +201,133 @@ class TelegramClientWrapper:
         """
         Register a handler for new messages from specific chats.
 
+        Messages are enqueued and handled by the worker pool started in
+        start(); if the queue is full the message is dropped with a warning.
+
         Args:
             chat_ids: List of chat IDs to monitor
             handler: Async function to handle messages
         """
+        queue = self._msg_queue
+
+        # Normalize and dedupe once; Telethon resolves the filter's chats
+        # into a set of peer IDs on first use, so lookups per update are O(1)
+        chat_ids = frozenset(int(chat_id) for chat_id in chat_ids)
+
         async def message_wrapper(event):
             try:
-                await handler(event.message)
-            except Exception as e:
-                logger.error(f"Error in message handler: {e}", exc_info=True)
+                queue.put_nowait((handler, event.message))
+            except asyncio.QueueFull:
+                logger.warning(
+                    "Message queue full (%d), dropping message %s from chat %s",
+                    queue.maxsize, event.message.id, event.chat_id
+                )
 
         # Use add_event_handler instead of decorator - works better with running clients
         # Note: incoming=True removed to allow testing with own messages
         self.client.add_event_handler(
             message_wrapper,
-            events.NewMessage(chats=chat_ids)
+            events.NewMessage(chats=list(chat_ids))
         )
 
         self._message_handlers.append(message_wrapper)
-        logger.info(f"Registered message handler for {len(chat_ids)} chat(s)")
+        logger.info("Registered message handler for %d chat(s)", len(chat_ids))
+
+    def _start_workers(self, concurrency: Optional[int] = None):
+        """
+        Start the worker tasks that drain the incoming message queue.
+
+        Args:
+            concurrency: Number of workers (defaults to settings.MAX_CONCURRENT_MESSAGES)
+        """
+        if self._workers:
+            return
+
+        concurrency = concurrency or settings.MAX_CONCURRENT_MESSAGES
+        self._workers = [
+            asyncio.create_task(self._worker_loop())
+            for _ in range(concurrency)
+        ]
+        logger.info("Started %d message worker(s)", concurrency)
+
+    async def _stop_workers(self):
+        """
+        Cancel the message workers and wait for them to exit.
+        """
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _worker_loop(self):
+        """
+        Pull queued messages and run their handler until cancelled.
+        """
+        queue = self._msg_queue
+
+        while True:
+            handler, message = await queue.get()
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.error("Error in message handler: %s", e, exc_info=True)
+            finally:
+                queue.task_done()
 
     async def run_until_disconnected(self):
         """
         Run the client until it's disconnected.
 
-        This method includes automatic reconnection logic.
+        This method includes automatic reconnection logic. Reconnect delays
+        grow exponentially with random jitter (so many clients don't retry in
+        lockstep), and the attempt counter only resets once a connection has
+        stayed up for STABLE_CONNECTION_SECONDS. After MAX_RECONNECT_ATTEMPTS
+        consecutive failures the client stops and this returns.
         """
-        reconnect_delay = 5
-        max_reconnect_delay = 300  # 5 minutes
+        base_delay = 5
+        max_delay = 300  # 5 minutes
+        attempt = 0
 
         while self._running:
+            connected_at = time.monotonic()
             try:
                 logger.info("Client is running. Listening for messages...")
                 await self.client.run_until_disconnected()
 
             except FloodWaitError as e:
-                logger.warning(f"Flood wait: sleeping for {e.seconds} seconds")
+                logger.warning("Flood wait: sleeping for %d seconds", e.seconds)
                 await asyncio.sleep(e.seconds)
 
             except Exception as e:
-                logger.error(f"Client disconnected: {e}")
+                logger.error("Client disconnected: %s", e)
 
                 if not self._running:
                     break
 
-                logger.info(f"Attempting to reconnect in {reconnect_delay}s...")
-                await asyncio.sleep(reconnect_delay)
+                # Only a connection that stayed up for a while counts as recovered
+                if time.monotonic() - connected_at > STABLE_CONNECTION_SECONDS:
+                    attempt = 0
+
+                if attempt >= MAX_RECONNECT_ATTEMPTS:
+                    logger.error("Giving up after %d reconnect attempts", attempt)
+                    self._running = False
+                    break
+
+                # Exponential backoff with jitter in [0.5, 1.5)
+                delay = min(base_delay * (2 ** attempt), max_delay)
+                delay *= 0.5 + random.random()
+                attempt += 1
 
-                # Exponential backoff
-                reconnect_delay = min(reconnect_delay * 2, max_reconnect_delay)
+                logger.info("Attempting to reconnect in %.1fs (attempt %d)...", delay, attempt)
+                await asyncio.sleep(delay)
 
                 # Try to reconnect
                 try:
                     if not self.client.is_connected():
                         await self.client.connect()
                         logger.info("✓ Reconnected successfully")
-                        reconnect_delay = 5  # Reset delay on success
                 except Exception as reconnect_error:
-                    logger.error(f"Reconnection failed: {reconnect_error}")
+                    logger.error("Reconnection failed: %s", reconnect_error)
 
     async def send_message(self, user_id: str, text: str, **kwargs) -> Message:
         """
@@ -273,81 +370,49 @@ class TelegramClientWrapper:
         """
         return await self.client.download_media(message, file=file)
 
-    def _check_existing_lock(self) -> bool:
+    def _acquire_lock(self) -> bool:
         """
-        Check if a lock file exists and is still valid.
+        Take an exclusive, non-blocking lock on the lock file.
+
+        Uses flock, or msvcrt.locking on Windows. The lock is held on an open
+        descriptor for the lifetime of the client, so the OS releases it
+        automatically if the process dies; a lock file left on disk after a
+        crash is harmless.
 
         Returns:
-            bool: True if another instance is running, False otherwise
+            bool: True if the lock was acquired, False if another instance holds it
         """
-        if not self.lock_file.exists():
-            return False
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.lock_file, os.O_CREAT | os.O_RDWR, 0o644)
 
         try:
-            # Read lock file to get PID and timestamp
-            with open(self.lock_file, 'r') as f:
-                data = f.read().strip().split('\n')
-                if len(data) < 2:
-                    self._remove_stale_lock("Invalid lock file format")
-                    return False
-
-                pid = int(data[0])
-                timestamp = float(data[1])
-
-                # Check if the process is still running
-                try:
-                    os.kill(pid, 0)  # Signal 0 just checks if process exists
-                    # Process exists - check if lock is stale
-                    age_hours = (time.time() - timestamp) / 3600
-                    if age_hours > 24:
-                        self._remove_stale_lock(f"age: {age_hours:.1f} hours")
-                        return False
-                    return True
-                except ProcessLookupError:
-                    # Process doesn't exist
-                    self._remove_stale_lock("Process no longer running")
-                    return False
-
-        except (ValueError, IndexError) as e:
-            self._remove_stale_lock(f"Invalid lock file data: {e}")
-            return False
-        except Exception as e:
-            logger.warning(f"Error checking lock file: {e}")
-            self._remove_stale_lock(f"Error: {e}")
+            if sys.platform == 'win32':
+                os.lseek(self._lock_fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._lock_fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(self._lock_fd)
+            self._lock_fd = None
             return False
 
-    def _remove_stale_lock(self, reason: str) -> None:
-        """
-        Remove a stale lock file.
+        # PID and start time are informational only
+        os.ftruncate(self._lock_fd, 0)
+        os.write(self._lock_fd, f"{os.getpid()}\n{time.time()}\n".encode())
+        logger.info("Acquired instance lock: %s", self.lock_file)
+        return True
 
-        Args:
-            reason: Reason for removal
-        """
-        logger.warning(f"Removing stale lock file ({reason})")
-        try:
-            self.lock_file.unlink()
-        except Exception as e:
-            logger.error(f"Failed to remove stale lock file: {e}")
-
-    def _create_lock_file(self):
+    def _release_lock(self):
         """
-        Create a lock file with current process ID and timestamp.
+        Release the instance lock by closing its descriptor.
         """
-        try:
-            with open(self.lock_file, 'w') as f:
-                f.write(f"{os.getpid()}\n")
-                f.write(f"{time.time()}\n")
-            logger.info(f"Created lock file: {self.lock_file}")
-        except Exception as e:
-            logger.error(f"Failed to create lock file: {e}")
+        if self._lock_fd is None:
+            return
 
-    def _remove_lock_file(self):
-        """
-        Remove the lock file when shutting down.
-        """
         try:
-            if self.lock_file.exists():
-                self.lock_file.unlink()
-                logger.info("Removed lock file")
-        except Exception as e:
-            logger.warning(f"Failed to remove lock file: {e}")
+            os.close(self._lock_fd)
+            logger.info("Released instance lock")
+        except OSError as e:
+            logger.warning("Failed to release instance lock: %s", e)
+        finally:
+            self._lock_fd = None
@@ -24,20 +24,29 @@ Requirements:
 import asyncio
 import signal
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime, time
-import pytz
+from datetime import datetime, time, timedelta
+from time import perf_counter
+from zoneinfo import ZoneInfo
 
 from config import settings
 from sources import SourceRegistry, TelegramSource
 from pipelines import UnifiedPipeline
-from services import StatusReporter, DailySummaryService
-from utils import setup_logger, get_logger
+from services import get_gemini_service, StatusReporter, DailySummaryService
+from utils import setup_logger, get_logger, shutdown_logging
 
 
 # Global logger
 logger = None
 
+# Daily summary timezone
+SGT = ZoneInfo('Asia/Singapore')
+
+# Default executor size. Blocking Gemini SDK calls hold a worker for seconds
+# each, so leave room beyond them for file writes, hashing and cleanup
+DEFAULT_EXECUTOR_WORKERS = settings.GEMINI_MAX_CONCURRENCY + 8
+
 
 async def schedule_daily_summary(daily_summary: DailySummaryService):
     """
@@ -48,34 +57,37 @@ async def schedule_daily_summary(daily_summary: DailySummaryService):
     Args:
         daily_summary: The DailySummaryService instance
     """
-    # Singapore timezone
-    sgt = pytz.timezone('Asia/Singapore')
     target_time = time(10, 0, 0)  # 10:00:00 AM SGT
 
-    logger.info(f"Daily summary scheduler started - will run at {target_time} SGT daily")
+    logger.info("Daily summary scheduler started - will run at %s SGT daily", target_time)
 
-    while True:
-        try:
-            # Get current time in SGT
-            now_sgt = datetime.now(sgt)
-            current_time = now_sgt.time()
+    # First run: today if we haven't passed the target time yet, else tomorrow
+    now_sgt = datetime.now(SGT)
+    days_ahead = 0 if now_sgt.time() < target_time else 1
+    target_datetime = datetime.combine(
+        now_sgt.date() + timedelta(days=days_ahead), target_time, tzinfo=SGT
+    )
 
-            # Calculate target datetime for today
-            target_datetime = datetime.combine(now_sgt.date(), target_time)
-            target_datetime = sgt.localize(target_datetime)
+    loop = asyncio.get_running_loop()
 
-            # If we've already passed today's target time, schedule for tomorrow
-            if now_sgt >= target_datetime:
-                target_datetime = target_datetime.replace(day=target_datetime.day + 1)
+    while True:
+        try:
+            # Skip any runs missed while suspended instead of firing them back-to-back
+            now_sgt = datetime.now(SGT)
+            while target_datetime <= now_sgt:
+                target_datetime += timedelta(days=1)
 
             # Calculate seconds until next run
             time_until_run = (target_datetime - now_sgt).total_seconds()
 
-            logger.info(f"Next daily summary scheduled for: {target_datetime.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-            logger.info(f"Time until next run: {time_until_run / 3600:.2f} hours")
+            logger.info("Next daily summary scheduled for: %s", target_datetime.strftime('%Y-%m-%d %H:%M:%S %Z'))
+            logger.info("Time until next run: %.2f hours", time_until_run / 3600)
 
-            # Sleep until the target time
-            await asyncio.sleep(time_until_run)
+            # Sleep until the target time against the loop's monotonic clock,
+            # topping up if the timer wakes early
+            deadline = loop.time() + time_until_run
+            while (remaining := deadline - loop.time()) > 0:
+                await asyncio.sleep(remaining)
 
             # Generate the daily summary
             logger.info("Triggering daily summary generation...")
@@ -85,49 +97,87 @@ async def schedule_daily_summary(daily_summary: DailySummaryService):
             logger.info("Daily summary scheduler cancelled")
             break
         except Exception as e:
-            logger.error(f"Error in daily summary scheduler: {e}", exc_info=True)
+            logger.error("Error in daily summary scheduler: %s", e, exc_info=True)
             # Wait 1 hour before retrying on error
             await asyncio.sleep(3600)
 
+        # Advance by exactly one day rather than recomputing from "now",
+        # so a run that finishes close to the target can't fire twice
+        target_datetime += timedelta(days=1)
+
+
+async def check_config() -> bool:
+    """
+    Validate the configuration.
+
+    Returns:
+        bool: True if valid
+    """
+    try:
+        settings.validate()
+        logger.info("✓ Configuration validated")
+        return True
+    except ValueError as e:
+        logger.error("✗ Configuration error: %s", e)
+        return False
+
+
+async def check_session() -> bool:
+    """
+    Check that the Telegram session file exists.
+
+    Returns:
+        bool: True if found
+    """
+    session_path = settings.BASE_DIR / f"{settings.SESSION_NAME}.session"
+    if not await asyncio.to_thread(session_path.exists):
+        logger.error("✗ Session file not found: %s", session_path)
+        logger.error("Please run: python scripts/create_session.py")
+        return False
+    logger.info("✓ Session file found")
+    return True
+
 
 async def health_checks() -> bool:
     """
     Perform pre-flight health checks.
 
+    The checks are independent, so they run concurrently and every failure
+    is reported, not just the first.
+
     Returns:
         bool: True if all checks pass, False otherwise
     """
     logger.info("Running health checks...")
 
-    try:
-        # Validate configuration
-        settings.validate()
-        logger.info("✓ Configuration validated")
+    results = await asyncio.gather(check_config(), check_session(), return_exceptions=True)
 
-        # Check session file exists
-        session_path = settings.BASE_DIR / f"{settings.SESSION_NAME}.session"
-        if not session_path.exists():
-            logger.error(f"✗ Session file not found: {session_path}")
-            logger.error("Please run: python scripts/create_session.py")
-            return False
-        logger.info("✓ Session file found")
-
-        # Test Gemini API
-        from services import GeminiService
-        gemini = GeminiService()
+    passed = True
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error("✗ Health check failed: %s", result)
+            passed = False
+        elif not result:
+            passed = False
+
+    return passed
+
+
+async def log_gemini_health():
+    """
+    Probe the Gemini API and log the result.
+
+    Not fatal either way, so main() runs this in the background while
+    Telegram connects instead of waiting on it.
+    """
+    try:
+        gemini = get_gemini_service()
         if await gemini.health_check():
             logger.info("✓ Gemini API accessible")
         else:
             logger.warning("⚠ Gemini API health check failed (but continuing)")
-
-        return True
-
-    except ValueError as e:
-        logger.error(f"✗ Configuration error: {e}")
-        return False
     except Exception as e:
-        logger.error(f"✗ Health check failed: {e}")
-        return False
+        logger.warning("⚠ Gemini API health check failed: %s (but continuing)", e)
 
 
 async def main():
@@ -139,6 +189,11 @@ async def main():
     # Setup logging
     logger = setup_logger('yaronotifs', level=settings.LOG_LEVEL)
 
+    # Sized explicitly: Python's default (cpu_count + 4) is only 5-6 threads on a small VPS
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=DEFAULT_EXECUTOR_WORKERS, thread_name_prefix='worker')
+    )
+
     logger.info("=" * 60)
     logger.info("MARKET INTELLIGENCE AGGREGATOR & ROUTER")
     logger.info("Modular Source Architecture")
@@ -150,6 +205,9 @@ async def main():
         logger.error("Health checks failed. Exiting.")
         return 1
 
+    # Probe Gemini concurrently with the Telegram connect below
+    gemini_health_task = asyncio.create_task(log_gemini_health())
+
     logger.info("")
     logger.info("Initializing modular source registry...")
 
@@ -167,7 +225,8 @@ async def main():
     telegram_source = TelegramSource(
         name="Telegram Channels",
         source_id="telegram",
-        monitored_channels=settings.MONITORED_CHANNELS
+        monitored_channels=list(settings.MONITORED_CHANNELS_TUPLE),
+        session_exists=True  # verified by health_checks()
     )
     registry.register(telegram_source)
 
@@ -219,8 +278,13 @@ async def main():
     # Start all sources
     if not await registry.start_all():
         logger.error("Failed to start sources. Exiting.")
+        gemini_health_task.cancel()
+        await asyncio.gather(gemini_health_task, return_exceptions=True)
         return 1
 
+    # Telegram is up; let the Gemini probe finish so it isn't left pending
+    await gemini_health_task
+
     # ========================================
     # Initialize Unified Pipeline
     # ========================================
@@ -246,7 +310,9 @@ async def main():
     # ========================================
     # Initialize Daily Summary Service
     # ========================================
-    daily_summary = DailySummaryService(client=telegram_client)
+    daily_summary = None
+    if settings.ENABLE_DAILY_SUMMARY:
+        daily_summary = DailySummaryService(client=telegram_client)
 
     # ========================================
     # Define Message Handler
@@ -258,43 +324,47 @@ async def main():
         Args:
             source_message: SourceMessage from any registered source
         """
-        import time
-        start_time = time.time()
+        log = logger
+        source_name = source_message.source_name
 
         try:
-            logger.info(f"⏱️ [TIMING] Starting pipeline processing for message from {source_message.source_name}")
-
-            pipeline_start = time.time()
+            t0 = perf_counter()
             success = await pipeline.process(source_message)
-            pipeline_time = time.time() - pipeline_start
-
-            total_time = time.time() - start_time
+            dt = perf_counter() - t0
 
             if success:
-                logger.info(f"✓ Processed message from {source_message.source_name} | Pipeline: {pipeline_time:.2f}s | Total: {total_time:.2f}s")
+                log.info("✓ Processed message from %s in %.2fs", source_name, dt)
             else:
-                logger.warning(f"✗ Failed to process message from {source_message.source_name}")
+                log.warning("✗ Failed to process message from %s", source_name)
         except Exception as e:
-            logger.error(f"Error processing message from {source_message.source_name}: {e}", exc_info=True)
+            log.error("Error processing message from %s: %s", source_name, e, exc_info=True)
             await status_reporter.report_error(
                 error_type="Pipeline Exception",
                 error_message=str(e),
-                context={"source": source_message.source_name}
+                context={"source": source_name}
             )
+        finally:
+            # Guarantee a reschedule point so a message flood can't starve
+            # the scheduler and other background tasks
+            await asyncio.sleep(0)
 
     # ========================================
     # Start Processing
     # ========================================
+    sources = registry.list_sources()
+    n_sources = len(sources)
+    n_channels = len(settings.MONITORED_CHANNELS)
+
     logger.info("")
     logger.info("=" * 60)
     logger.info("✓ BOT IS RUNNING")
     logger.info("=" * 60)
     logger.info("")
-    logger.info(f"Architecture: Modular Source Registry + Unified Pipeline")
-    logger.info(f"Active sources: {len(registry.list_sources())}")
-    for source_id in registry.list_sources():
+    logger.info("Architecture: Modular Source Registry + Unified Pipeline")
+    logger.info("Active sources: %d", n_sources)
+    for source_id in sources:
         source = registry.get_source(source_id)
-        logger.info(f"  • {source.name} (ID: {source_id})")
+        logger.info("  • %s (ID: %s)", source.name, source_id)
     logger.info("")
     logger.info("All messages processed through UnifiedPipeline with LLM intelligence")
     logger.info("Press Ctrl+C to stop")
@@ -302,19 +372,26 @@ async def main():
 
     # Send startup notification
     await status_reporter.report_startup(
-        monitored_channels=len(settings.MONITORED_CHANNELS)
+        monitored_channels=n_channels
     )
 
     # Setup graceful shutdown
     shutdown_event = asyncio.Event()
 
-    def signal_handler(sig, frame):
+    def signal_handler():
         logger.info("")
         logger.info("Shutdown signal received...")
         shutdown_event.set()
 
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Loop-integrated handlers wake the event loop as soon as the signal arrives.
+    # Windows event loops don't support them; fall back to signal.signal and
+    # hop back onto the loop thread from there.
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, signal_handler)
+        except NotImplementedError:
+            signal.signal(sig, lambda signum, frame: loop.call_soon_threadsafe(signal_handler))
 
     try:
         # Start message processing and wait for shutdown
@@ -323,18 +400,29 @@ async def main():
         )
 
         # Start daily summary scheduler
-        summary_task = asyncio.create_task(
-            schedule_daily_summary(daily_summary)
-        )
-
-        logger.info("✓ Daily summary scheduler started")
+        summary_task = None
+        if daily_summary is not None:
+            summary_task = asyncio.create_task(
+                schedule_daily_summary(daily_summary)
+            )
+            logger.info("✓ Daily summary scheduler started")
+        else:
+            logger.info("Daily summary disabled (ENABLE_DAILY_SUMMARY=false)")
 
-        # Wait for shutdown signal
-        await shutdown_event.wait()
+        # Wait for a shutdown signal, or for processing to stop on its own
+        shutdown_task = asyncio.create_task(shutdown_event.wait())
+        done, pending = await asyncio.wait(
+            {processing_task, shutdown_task},
+            return_when=asyncio.FIRST_COMPLETED
+        )
 
-        # Cancel processing and summary tasks
-        processing_task.cancel()
-        summary_task.cancel()
+        # Cancel whatever is still running and wait for it to unwind,
+        # so no task is left dangling when the loop closes
+        if summary_task is not None:
+            pending.add(summary_task)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
 
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received")
@@ -342,12 +430,15 @@ async def main():
     finally:
         logger.info("Shutting down...")
 
+        # Let queued output go out before disconnecting
+        await pipeline.close()
+
         # Stop all sources
         await registry.stop_all()
 
         # Health check one last time
         health = await registry.health_check()
-        logger.info(f"Final health check: {health}")
+        logger.info("Final health check: %s", health)
 
         logger.info("")
         logger.info("Goodbye!")
@@ -356,12 +447,28 @@ async def main():
 
 
 if __name__ == '__main__':
+    # Use uvloop's faster event loop where available (optional dependency).
+    # Python 3.12+ takes it as a loop factory; event loop policies are
+    # deprecated there.
+    run_kwargs = {}
     try:
-        exit_code = asyncio.run(main())
+        import uvloop
+        if sys.version_info >= (3, 12):
+            run_kwargs['loop_factory'] = uvloop.new_event_loop
+        else:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
+    try:
+        exit_code = asyncio.run(main(), **run_kwargs)
         sys.exit(exit_code)
     except Exception as e:
         if logger:
-            logger.error(f"Fatal error: {e}", exc_info=True)
+            logger.error("Fatal error: %s", e, exc_info=True)
         else:
             print(f"Fatal error: {e}")
         sys.exit(1)
+    finally:
+        # Flush log records still queued for the background listener
+        shutdown_logging()
@@ -1,10 +1,20 @@
+import asyncio
+import hashlib
+import io
 from pathlib import Path
-from typing import Optional
+from typing import List, Union
 from telethon.tl.types import Message
 
-from .base import BasePipeline
-from services import GeminiService, PDFService
-from utils import truncate_text
+from .base import OUTPUT_FORMAT, BasePipeline
+from services import PDFService, get_gemini_service
+from config import settings
+from utils import LRUCache, safe_filename, sha256_file, truncate_text
+
+# A downloaded report: in memory normally, on disk if it's too large to buffer
+PDFSource = Union[io.BytesIO, Path]
+
+# MIME types that say nothing about the content; only then is the filename checked
+_UNTYPED_MIME_TYPES = frozenset({None, '', 'application/octet-stream'})
 
 
 class AnalystPipeline(BasePipeline):
@@ -17,13 +27,39 @@ class AnalystPipeline(BasePipeline):
     Key Feature: Uses Gemini's native PDF processing to analyze both text AND visual
     elements (charts, graphs, financial tables, valuation models) - not just text extraction.
 
+    Downloads and analysis run as separate stages: each process() call downloads
+    its PDF and hands it to a pool of ANALYSIS_WORKERS long-lived analyzer
+    tasks through a bounded queue, so several reports are analyzed at once
+    and Gemini work overlaps the Telegram downloads of the next ones.
+
+    Analyses are cached by the SHA-256 of the PDF, so a report reposted or
+    fanned out to several channels is only sent to Gemini once.
+
     Cost: METERED (Gemini API - approximately $0.001-0.002 per report)
     """
 
+    # Reports analyzed concurrently, and downloaded PDFs waiting for a free
+    # analyzer before process() calls back off
+    ANALYSIS_WORKERS = 4
+    ANALYSIS_QUEUE_SIZE = 4
+
+    # Reports up to this size are downloaded into memory instead of temp files
+    MAX_IN_MEMORY_PDF_BYTES = settings.MAX_PDF_SIZE_MB * 1024 * 1024
+
+    # Analysis cache: entries per pipeline and how long a summary is reused
+    ANALYSIS_CACHE_SIZE = 256
+    ANALYSIS_CACHE_TTL = 24 * 3600  # seconds
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.gemini = GeminiService()
+        self.gemini = get_gemini_service()
         self.pdf_service = PDFService()
+        self._analysis_queue: asyncio.Queue = asyncio.Queue(maxsize=self.ANALYSIS_QUEUE_SIZE)
+        self._analyzer_tasks: List[asyncio.Task] = []
+        self._analysis_cache: LRUCache[str] = LRUCache(
+            maxsize=self.ANALYSIS_CACHE_SIZE,
+            ttl=self.ANALYSIS_CACHE_TTL
+        )
         self.logger.info("AnalystPipeline initialized with Gemini and PDF services")
 
     async def process(self, message: Message) -> bool:
@@ -33,10 +69,11 @@ class AnalystPipeline(BasePipeline):
         Workflow:
         1. Check if message has a PDF attachment
         2. Download the PDF file
-        3. Upload PDF to Gemini File API (multimodal analysis)
-        4. Receive analysis of both text and visual elements
-        5. Forward summary + original PDF to target user
-        6. Cleanup temporary files
+        3. Queue it for the analyzer task, which:
+           - Uploads the PDF to Gemini File API (multimodal analysis)
+           - Forwards summary + original PDF to target user
+           - Releases the downloaded PDF
+        4. Wait for the analyzer's result
 
         Args:
             message: Incoming message from DTpapers channel
@@ -44,47 +81,43 @@ class AnalystPipeline(BasePipeline):
         Returns:
             bool: True if processing succeeded, False otherwise
         """
-        pdf_path = None
+        log = self.logger
+        pdf = None
+        queued = False
 
         try:
             # Check for PDF document
-            if not message.document:
-                self.logger.debug("No document in message, skipping")
+            document = message.document
+            if document is None:
+                log.debug("No document in message, skipping")
                 return False
 
-            # Verify it's a PDF
-            mime_type = message.document.mime_type
-            filename = message.file.name if message.file else 'document.pdf'
-
-            if not (mime_type == 'application/pdf' or filename.endswith('.pdf')):
-                self.logger.debug(f"Not a PDF document: {mime_type}, skipping")
-                return False
+            # Verify it's a PDF: MIME type first, filename only if the type is generic
+            mime_type = document.mime_type
+            if mime_type != 'application/pdf':
+                name = message.file.name if mime_type in _UNTYPED_MIME_TYPES and message.file else None
+                if not (name and name.lower().endswith('.pdf')):
+                    log.debug("Not a PDF document: %s, skipping", mime_type)
+                    return False
 
-            self.logger.info(f"Processing PDF: {filename}")
+            filename = (message.file.name if message.file else None) or 'document.pdf'
 
-            # Download the PDF using Telethon's download method
-            pdf_path = await self._download_pdf_from_message(message, filename)
-
-            # Analyze PDF directly using Gemini's File API (multimodal)
-            # This captures both text and visual elements (charts, graphs, unlock schedules)
-            summary = await self.gemini.analyze_pdf_file(pdf_path)
+            log.info("Processing PDF: %s", filename)
 
-            # Format and forward the result with the PDF attached
-            formatted_message = self._format_analysis_result(
-                message=message,
-                filename=filename,
-                summary=summary
-            )
+            # Download stage (hash off the event loop, keyed for the analysis cache)
+            pdf = await self._download_pdf_from_message(message, filename)
+            digest = await asyncio.to_thread(self._digest, pdf)
 
-            success = await self.forward_to_target(
-                text=formatted_message,
-                file_path=str(pdf_path)
-            )
+            # Hand off to the analyzer stage; it owns the PDF from here on
+            self._ensure_analyzer()
+            result = asyncio.get_running_loop().create_future()
+            await self._analysis_queue.put((message, filename, pdf, digest, result))
+            queued = True
 
-            return success
+            return await result
 
         except Exception as e:
-            self.logger.error(f"Error in AnalystPipeline.process: {e}", exc_info=True)
+            log.error("Error in AnalystPipeline.process: %s", e, exc_info=True)
 
             # Try to send error notification to user
             try:
@@ -96,41 +129,149 @@ class AnalystPipeline(BasePipeline):
             return False
 
         finally:
-            # Always cleanup temporary PDF file
-            if pdf_path:
-                await self.pdf_service.cleanup_file(pdf_path)
+            # Release here only if the analyzer never took the PDF
+            if pdf is not None and not queued:
+                await self._release_pdf(pdf)
+
+    def _ensure_analyzer(self):
+        """
+        Start the analyzer tasks on first use, replacing any that died
+        (needs a running event loop).
+        """
+        self._analyzer_tasks = [task for task in self._analyzer_tasks if not task.done()]
+        while len(self._analyzer_tasks) < self.ANALYSIS_WORKERS:
+            self._analyzer_tasks.append(asyncio.create_task(self._analyzer_worker()))
+
+    async def _analyzer_worker(self):
+        """
+        Analyze queued PDFs (one at a time per worker) and resolve each caller's result.
+        """
+        queue = self._analysis_queue
+
+        while True:
+            message, filename, pdf, digest, result = await queue.get()
+            try:
+                success = await self._analyze_stage(message, filename, pdf, digest)
+                if not result.done():
+                    result.set_result(success)
+            except Exception as e:
+                if not result.done():
+                    result.set_exception(e)
+            finally:
+                # Always release the downloaded PDF
+                await self._release_pdf(pdf)
+                queue.task_done()
+
+    async def _analyze_stage(self, message: Message, filename: str, pdf: PDFSource, digest: str) -> bool:
+        """
+        Analyze a downloaded PDF with Gemini and forward the result.
+
+        Args:
+            message: Original Telegram message
+            filename: PDF filename
+            pdf: The downloaded PDF (in memory or on disk)
+            digest: SHA-256 of the PDF (analysis cache key)
 
-    async def _download_pdf_from_message(self, message: Message, filename: str) -> Path:
+        Returns:
+            bool: True if the result was forwarded successfully
+        """
+        summary = self._analysis_cache.get(digest)
+        if summary is not None:
+            self.logger.info("Analysis cache hit for %s", filename)
+        else:
+            # Analyze PDF directly using Gemini's File API (multimodal)
+            # This captures both text and visual elements (charts, graphs, unlock schedules)
+            if isinstance(pdf, Path):
+                summary = await self.gemini.analyze_pdf_file(pdf)
+            else:
+                summary = await self.gemini.analyze_pdf_bytes(pdf)
+            self._analysis_cache.set(digest, summary)
+
+        # Format and forward the result with the PDF attached
+        formatted_message = self._format_analysis_result(
+            message=message,
+            filename=filename,
+            summary=summary
+        )
+
+        if isinstance(pdf, Path):
+            attachment = str(pdf)
+        else:
+            pdf.seek(0)
+            attachment = pdf
+
+        return await self.forward_to_target(
+            text=formatted_message,
+            file_path=attachment
+        )
+
+    async def _download_pdf_from_message(self, message: Message, filename: str) -> PDFSource:
         """
         Download PDF directly from Telegram message.
 
-        Uses Telethon's built-in download method for efficiency.
+        Uses Telethon's built-in download method for efficiency. Reports up to
+        MAX_IN_MEMORY_PDF_BYTES are downloaded into a BytesIO, so they go
+        straight from Telegram to Gemini without a temp-file write and re-read;
+        larger ones are streamed in chunks to a file in the temp directory.
 
         Args:
             message: Telegram message with document
             filename: Target filename
 
         Returns:
-            Path: Path to downloaded file
+            BytesIO or Path: The downloaded PDF
 
         Raises:
             Exception: If download fails
         """
-        from utils import safe_filename
-
         safe_name = safe_filename(filename)
-        file_path = self.pdf_service.temp_dir / safe_name
 
         try:
             # Download using Telethon's optimized method
-            await self.client.download_media(message.document, file=str(file_path))
-            self.logger.info(f"Downloaded PDF: {safe_name}")
+            if (message.document.size or 0) <= self.MAX_IN_MEMORY_PDF_BYTES:
+                buffer = io.BytesIO()
+                buffer.name = safe_name  # Telethon uses this as the upload filename
+                await self.client.download_media(message.document, file=buffer)
+                buffer.seek(0)
+                self.logger.info("Downloaded PDF into memory: %s", safe_name)
+                return buffer
+
+            file_path = self.pdf_service.temp_dir / safe_name
+            await self.pdf_service.download_document(self.client, message.document, file_path)
+            self.logger.info("Downloaded PDF: %s", safe_name)
             return file_path
 
         except Exception as e:
-            self.logger.error(f"Failed to download PDF: {e}")
+            self.logger.error("Failed to download PDF: %s", e)
             raise
 
+    @staticmethod
+    def _digest(pdf: PDFSource) -> str:
+        """
+        SHA-256 of a downloaded PDF (blocking; run via asyncio.to_thread).
+
+        Args:
+            pdf: The downloaded PDF
+
+        Returns:
+            str: Hex digest
+        """
+        if isinstance(pdf, Path):
+            return sha256_file(pdf)
+        return hashlib.sha256(pdf.getbuffer()).hexdigest()
+
+    async def _release_pdf(self, pdf: PDFSource) -> None:
+        """
+        Free a downloaded PDF: delete the temp file or close the buffer.
+
+        Args:
+            pdf: The downloaded PDF
+        """
+        if isinstance(pdf, Path):
+            await self.pdf_service.cleanup_file(pdf)
+        else:
+            pdf.close()
+
     def _format_analysis_result(self, message: Message, filename: str, summary: str) -> str:
         """
         Format the analysis result for forwarding.
@@ -143,8 +284,4 @@ class AnalystPipeline(BasePipeline):
         Returns:
             str: Formatted message in Markdown
         """
-        via_source = self._format_via_source(message)
-
-        return f"""{summary}
-
-from: {via_source}"""
+        return OUTPUT_FORMAT % (summary, self._format_via_source(message))
@@ -1,12 +1,18 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from collections import defaultdict
+from typing import IO, DefaultDict, Dict, List, Optional, Tuple, Union
 from telethon import TelegramClient
+from telethon.errors import FloodWaitError
 from telethon.tl.types import Message
 
-from utils import get_logger
+from utils import AsyncTokenBucket, get_logger
 
 logger = get_logger(__name__)
 
+# Forwarded message layout: content, then the source attribution
+OUTPUT_FORMAT = "%s\n\nfrom: %s"
+
 
 class BasePipeline(ABC):
     """
@@ -14,8 +20,39 @@ class BasePipeline(ABC):
 
     All pipelines must implement the `process` method which handles
     the business logic for transforming and routing messages.
+
+    Outgoing messages go through per-pipeline background senders, so
+    pipeline throughput isn't capped by Telegram's send round-trip. Text is
+    sent in order by one sender; files go through a separate lane, so a
+    large upload never holds up the text messages queued behind it.
+
+    Sends are paced by token buckets shared across all pipelines (Telegram's
+    limits are per account): 30 messages/s overall and 20/minute per chat,
+    so bursts queue just under the limit instead of triggering flood waits.
+    Consecutive text messages for the same chat are merged into one post
+    during bursts, so fewer sends count against the per-chat limit.
     """
 
+    # Outgoing messages buffered (per lane) before forward_to_target() callers wait
+    SEND_QUEUE_SIZE = 64
+
+    # Concurrent senders in the file lane
+    FILE_SEND_WORKERS = 2
+
+    # Attempts per message when Telegram responds with a flood wait
+    MAX_FLOOD_WAIT_ATTEMPTS = 3
+
+    # Text coalescing under a backlog: merged size cap and the separator
+    # between merged messages
+    COALESCE_MAX_CHARS = 3500
+    COALESCE_SEPARATOR = '\n\n---\n\n'
+
+    # Outgoing rate limits, shared by every pipeline
+    _global_bucket = AsyncTokenBucket(capacity=30, refill_rate=30)
+    _per_chat_bucket: DefaultDict[str, AsyncTokenBucket] = defaultdict(
+        lambda: AsyncTokenBucket(capacity=20, refill_rate=20 / 60)
+    )
+
     def __init__(self, client: TelegramClient, output_channel_id: str):
         """
         Initialize the pipeline.
@@ -28,6 +65,15 @@ class BasePipeline(ABC):
         self.output_channel_id = output_channel_id
         self.logger = get_logger(self.__class__.__name__)
 
+        # Text lane (ordered, coalesced) and file lane
+        self._send_queue: asyncio.Queue = asyncio.Queue(maxsize=self.SEND_QUEUE_SIZE)
+        self._send_task: Optional[asyncio.Task] = None
+        self._file_queue: asyncio.Queue = asyncio.Queue(maxsize=self.SEND_QUEUE_SIZE)
+        self._file_tasks: List[asyncio.Task] = []
+
+        # Per-chat attribution: chat_id -> (source name, message link prefix)
+        self._src_cache: Dict[int, Tuple[str, Optional[str]]] = {}
+
     @abstractmethod
     async def process(self, message: Message) -> bool:
         """
@@ -46,11 +92,145 @@ class BasePipeline(ABC):
         """
         pass
 
-    async def forward_to_target(self, text: str, file_path: Optional[str] = None,
+    async def forward_to_target(self, text: str, file_path: Optional[Union[str, IO[bytes]]] = None,
                                  parse_mode: str = 'Markdown', target_channel: Optional[str] = None) -> bool:
         """
         Forward a processed message to the output channel.
 
+        The message is handed to the background sender for its lane (text or
+        file), and this waits until it has been sent so failures reach the
+        caller.
+
+        Args:
+            text: The message text to send
+            file_path: Optional file to attach (path, or a named file object such as BytesIO)
+            parse_mode: Telegram parse mode (Markdown or HTML)
+            target_channel: Optional specific target channel (overrides default)
+
+        Returns:
+            bool: True if sent successfully, False otherwise
+        """
+        done = asyncio.get_running_loop().create_future()
+
+        if file_path:
+            self._ensure_file_senders()
+            await self._file_queue.put((text, file_path, parse_mode, target_channel, done))
+        else:
+            self._ensure_sender()
+            await self._send_queue.put((text, None, parse_mode, target_channel, done))
+
+        return await done
+
+    async def close(self, timeout: float = 30.0) -> None:
+        """
+        Wait for queued messages to be sent, then stop the background senders.
+
+        Args:
+            timeout: Maximum seconds to wait for the queues to drain
+        """
+        tasks = self._file_tasks + ([self._send_task] if self._send_task is not None else [])
+        if not tasks:
+            return
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(self._send_queue.join(), self._file_queue.join()),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            unsent = self._send_queue.qsize() + self._file_queue.qsize()
+            self.logger.warning("Dropping %d unsent message(s) on shutdown", unsent)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._send_task = None
+        self._file_tasks = []
+
+        # Fail whatever is still queued, so forward_to_target() callers don't hang
+        for queue in (self._send_queue, self._file_queue):
+            while not queue.empty():
+                *_, done = queue.get_nowait()
+                if not done.done():
+                    done.set_result(False)
+                queue.task_done()
+
+    def _ensure_sender(self):
+        """
+        Start the background text sender on first use (needs a running event loop).
+        """
+        if self._send_task is None or self._send_task.done():
+            self._send_task = asyncio.create_task(self._send_loop())
+
+    def _ensure_file_senders(self):
+        """
+        Start the file-lane senders on first use, replacing any that exited.
+        """
+        self._file_tasks = [task for task in self._file_tasks if not task.done()]
+        while len(self._file_tasks) < self.FILE_SEND_WORKERS:
+            self._file_tasks.append(asyncio.create_task(self._file_send_loop()))
+
+    async def _send_loop(self):
+        """
+        Send queued text messages in order.
+
+        Text messages are coalesced with the ones queued right behind them
+        (see _coalesce).
+        """
+        queue = self._send_queue
+        carry = None
+
+        try:
+            while True:
+                if carry is not None:
+                    item, carry = carry, None
+                else:
+                    item = await queue.get()
+
+                batch = [item]
+                text, _, parse_mode, target_channel, _ = item
+                carry = await self._coalesce(batch)
+                if len(batch) > 1:
+                    text = self.COALESCE_SEPARATOR.join(queued[0] for queued in batch)
+                    self.logger.debug("Coalesced %d messages into one send", len(batch))
+
+                success = False
+                try:
+                    success = await self._send_with_retry(text, None, parse_mode, target_channel)
+                finally:
+                    for *_, done in batch:
+                        if not done.done():
+                            done.set_result(success)
+                        queue.task_done()
+        finally:
+            # An item pulled out of the queue but not yet sent
+            if carry is not None:
+                *_, done = carry
+                if not done.done():
+                    done.set_result(False)
+                queue.task_done()
+
+    async def _file_send_loop(self):
+        """
+        Send queued messages with files, one at a time per worker.
+        """
+        queue = self._file_queue
+
+        while True:
+            text, file_path, parse_mode, target_channel, done = await queue.get()
+            success = False
+            try:
+                success = await self._send_with_retry(text, file_path, parse_mode, target_channel)
+            finally:
+                if not done.done():
+                    done.set_result(success)
+                queue.task_done()
+
+    async def _send_with_retry(self, text: str, file_path: Optional[Union[str, IO[bytes]]],
+                               parse_mode: str, target_channel: Optional[str]) -> bool:
+        """
+        Send a message, retrying on Telegram flood waits.
+
         Args:
             text: The message text to send
             file_path: Optional file to attach
@@ -60,6 +240,67 @@ class BasePipeline(ABC):
         Returns:
             bool: True if sent successfully, False otherwise
         """
+        for attempt in range(1, self.MAX_FLOOD_WAIT_ATTEMPTS + 1):
+            try:
+                return await self._send_now(text, file_path, parse_mode, target_channel)
+            except FloodWaitError as e:
+                if attempt == self.MAX_FLOOD_WAIT_ATTEMPTS:
+                    self.logger.error("Failed to forward to output channel: flood wait (%ss)", e.seconds)
+                    break
+                delay = e.seconds * attempt
+                self._global_bucket.pause(e.seconds)
+                self.logger.warning("Flood wait on send, retrying in %ss", delay)
+                await asyncio.sleep(delay)
+        return False
+
+    async def _coalesce(self, batch: list) -> Optional[tuple]:
+        """
+        Pull text messages for the same chat that follow batch[0] in the queue.
+
+        Only merges what is already waiting (a backlog); never waits for
+        more, so a lone message is sent immediately.
+
+        Args:
+            batch: List holding the first (text-only) queue item; extended in place
+
+        Returns:
+            tuple: An item taken from the queue that couldn't be merged (to be
+            sent next), or None
+        """
+        queue = self._send_queue
+        text, _, parse_mode, target_channel, _ = batch[0]
+        size = len(text)
+
+        while not queue.empty():
+            item = queue.get_nowait()
+            item_text, _, item_mode, item_target, _ = item
+            size += len(self.COALESCE_SEPARATOR) + len(item_text)
+
+            if (item_mode != parse_mode or item_target != target_channel
+                    or size > self.COALESCE_MAX_CHARS):
+                return item
+
+            batch.append(item)
+
+        return None
+
+    async def _send_now(self, text: str, file_path: Optional[Union[str, IO[bytes]]] = None,
+                        parse_mode: str = 'Markdown', target_channel: Optional[str] = None) -> bool:
+        """
+        Send a message to the output channel right away.
+
+        Args:
+            text: The message text to send
+            file_path: Optional file to attach
+            parse_mode: Telegram parse mode (Markdown or HTML)
+            target_channel: Optional specific target channel (overrides default)
+
+        Returns:
+            bool: True if sent successfully, False otherwise
+
+        Raises:
+            FloodWaitError: If Telegram asks us to slow down (retried by the sender)
+        """
         try:
             # Use specified target or default
             output_channel = target_channel if target_channel else self.output_channel_id
@@ -76,14 +317,16 @@ class BasePipeline(ABC):
                         # Split into chunks
                         chunks = self._split_text(text, MAX_MESSAGE_LENGTH)
                         for i, chunk in enumerate(chunks):
+                            await self._throttle(output_channel)
                             await self.client.send_message(
                                 output_channel,
                                 chunk,
                                 parse_mode=parse_mode
                             )
-                            self.logger.info(f"Sent text chunk {i+1}/{len(chunks)}")
+                            self.logger.info("Sent text chunk %d/%d", i+1, len(chunks))
                     else:
                         # Send as single message
+                        await self._throttle(output_channel)
                         await self.client.send_message(
                             output_channel,
                             text,
@@ -91,46 +334,62 @@ class BasePipeline(ABC):
                         )
 
                     # Send file with short caption
+                    await self._throttle(output_channel)
                     await self.client.send_file(
                         output_channel,
                         file_path,
                         caption="📎 Attached document"
                     )
-                    self.logger.info(f"Sent file to {output_channel}")
+                    self.logger.info("Sent file to %s", output_channel)
                 else:
                     # Send file with caption
+                    await self._throttle(output_channel)
                     await self.client.send_file(
                         output_channel,
                         file_path,
                         caption=text,
                         parse_mode=parse_mode
                     )
-                    self.logger.info(f"Sent message with file to {output_channel}")
+                    self.logger.info("Sent message with file to %s", output_channel)
             else:
                 # Text only - split if needed
                 if len(text) > MAX_MESSAGE_LENGTH:
                     chunks = self._split_text(text, MAX_MESSAGE_LENGTH)
                     for i, chunk in enumerate(chunks):
+                        await self._throttle(output_channel)
                         await self.client.send_message(
                             output_channel,
                             chunk,
                             parse_mode=parse_mode
                         )
-                        self.logger.info(f"Sent text chunk {i+1}/{len(chunks)} to {output_channel}")
+                        self.logger.info("Sent text chunk %d/%d to %s", i+1, len(chunks), output_channel)
                 else:
+                    await self._throttle(output_channel)
                     await self.client.send_message(
                         output_channel,
                         text,
                         parse_mode=parse_mode
                     )
-                    self.logger.info(f"Sent message to {output_channel}")
+                    self.logger.info("Sent message to %s", output_channel)
 
             return True
 
+        except FloodWaitError:
+            raise
         except Exception as e:
-            self.logger.error(f"Failed to forward to output channel: {e}")
+            self.logger.error("Failed to forward to output channel: %s", e)
             return False
 
+    async def _throttle(self, chat: str) -> None:
+        """
+        Wait for a send slot under the global and per-chat rate limits.
+
+        Args:
+            chat: Destination chat
+        """
+        await self._global_bucket.acquire()
+        await self._per_chat_bucket[chat].acquire()
+
     def _split_text(self, text: str, max_length: int) -> List[str]:
         """
         Split text into chunks at paragraph boundaries.
@@ -168,6 +427,26 @@ class BasePipeline(ABC):
 
         return chunks
 
+    def _extract_text(self, message: Message) -> Optional[str]:
+        """
+        Extract text content from a message.
+
+        The text is only stripped if it actually starts or ends with
+        whitespace, so the common case returns the original string uncopied.
+
+        Args:
+            message: Telegram message
+
+        Returns:
+            str: Extracted text or None
+        """
+        text = message.text or message.message
+        if not text:
+            return None
+        if text[0].isspace() or text[-1].isspace():
+            return text.strip()
+        return text
+
     def _get_source_info(self, message: Message) -> str:
         """
         Extract source channel information from a message.
@@ -178,16 +457,7 @@ class BasePipeline(ABC):
         Returns:
             str: Formatted source information
         """
-        try:
-            chat = message.chat
-            if hasattr(chat, 'title'):
-                return chat.title
-            elif hasattr(chat, 'username'):
-                return f"@{chat.username}"
-            else:
-                return f"Channel {message.chat_id}"
-        except Exception:
-            return "Unknown Source"
+        return self._chat_attribution(message)[0]
 
     def _get_message_link(self, message: Message) -> Optional[str]:
         """
@@ -199,26 +469,55 @@ class BasePipeline(ABC):
         Returns:
             str: Message link in format t.me/... or None if unable to generate
         """
-        try:
-            chat = message.chat
-            message_id = message.id
+        link_prefix = self._chat_attribution(message)[1]
+        return f"{link_prefix}{message.id}" if link_prefix else None
 
-            # For channels/groups with username
-            if hasattr(chat, 'username') and chat.username:
-                return f"https://t.me/{chat.username}/{message_id}"
+    def _chat_attribution(self, message: Message) -> Tuple[str, Optional[str]]:
+        """
+        Get the source name and message link prefix for a message's chat.
 
-            # For channels/groups without username (private, use ID)
-            # Format: t.me/c/{channel_id_without_prefix}/{message_id}
-            chat_id = str(chat.id)
-            if chat_id.startswith('-100'):
-                # Remove the -100 prefix for private channel links
-                channel_id = chat_id[4:]
-                return f"https://t.me/c/{channel_id}/{message_id}"
+        Both are constant per chat, so they're computed once per chat_id.
 
-            return None
-        except Exception as e:
-            self.logger.warning(f"Failed to generate message link: {e}")
-            return None
+        Args:
+            message: Telegram message
+
+        Returns:
+            tuple: (source name, link prefix to append the message ID to, or None)
+        """
+        chat_id = message.chat_id
+        cached = self._src_cache.get(chat_id)
+        if cached is not None:
+            return cached
+
+        chat = message.chat
+        title = getattr(chat, 'title', None)
+        username = getattr(chat, 'username', None)
+
+        if title:
+            name = title
+        elif username:
+            name = f"@{username}"
+        else:
+            name = f"Channel {chat_id}"
+
+        # For channels/groups with username
+        if username:
+            link_prefix = f"https://t.me/{username}/"
+        # For channels/groups without username (private, use ID)
+        # Format: t.me/c/{channel_id_without_prefix}/{message_id}
+        elif chat is not None and chat.id < -1000000000000:
+            # Strip the -100 prefix arithmetically: -100XXXXXXXXXX -> XXXXXXXXXX
+            link_prefix = f"https://t.me/c/{-chat.id - 1000000000000}/"
+        else:
+            link_prefix = None
+
+        attribution = (name, link_prefix)
+
+        # Don't pin the fallback if the chat entity isn't loaded yet
+        if chat is not None:
+            self._src_cache[chat_id] = attribution
+
+        return attribution
 
     def _format_via_source(self, message: Message) -> str:
         """
@@ -1,9 +1,13 @@
-from typing import Optional
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 from telethon.tl.types import Message
 from deep_translator import GoogleTranslator
 
-from .base import BasePipeline
-from utils import detect_chinese, retry_async
+from .base import OUTPUT_FORMAT, BasePipeline
+from utils import LRUCache, detect_chinese, retry_async
 
 
 class TranslatorPipeline(BasePipeline):
@@ -13,12 +17,37 @@ class TranslatorPipeline(BasePipeline):
     This pipeline handles messages from Chinese news channels (BWEnews, Foresight News).
     It detects Chinese text and translates it to English using a free translation service.
 
+    Translations are cached per chunk (keyed by a BLAKE2b digest of the text),
+    and concurrent requests for the same text share one in-flight call, so
+    reposts of the same headline across channels hit Google only once.
+
     Cost: FREE (uses Google Translate via deep-translator)
     """
 
+    # Translated chunks kept in memory
+    TRANSLATION_CACHE_SIZE = 2048
+
+    # Chunks of one long text translated concurrently
+    MAX_CONCURRENT_CHUNKS = 4
+
+    # Threads in the pipeline's own translation executor
+    TRANSLATION_WORKERS = 4
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.translator = GoogleTranslator(source='zh-CN', target='en')
+        # Translators keep per-request state on the instance, so each
+        # executor thread gets its own (see _translator()). deep-translator
+        # opens a new connection per call; pooling them would mean
+        # re-implementing its translate(), so that's left as is
+        self._thread_local = threading.local()
+        # Own executor, so translation bursts don't compete with other users
+        # of the loop's default pool (and vice versa)
+        self._xlat_pool = ThreadPoolExecutor(
+            max_workers=self.TRANSLATION_WORKERS,
+            thread_name_prefix='xlat'
+        )
+        self._translation_cache: LRUCache[str] = LRUCache(maxsize=self.TRANSLATION_CACHE_SIZE)
+        self._inflight_translations: Dict[bytes, asyncio.Future] = {}
         self.logger.info("TranslatorPipeline initialized with GoogleTranslator")
 
     async def process(self, message: Message) -> bool:
@@ -49,8 +78,12 @@ class TranslatorPipeline(BasePipeline):
                 self.logger.debug("No Chinese detected, forwarding original text")
                 return await self._forward_original(message, text)
 
-            # Translate the text
-            translated_text = await self._translate_text(text)
+            # Translate the text (retried with backoff; None once retries are exhausted)
+            try:
+                translated_text = await self._translate_text(text)
+            except Exception as e:
+                self.logger.error("Translation error: %s", e)
+                translated_text = None
             if not translated_text:
                 self.logger.warning("Translation failed, forwarding original")
                 return await self._forward_original(message, text)
@@ -65,71 +98,119 @@ class TranslatorPipeline(BasePipeline):
             return await self.forward_to_target(formatted_message)
 
         except Exception as e:
-            self.logger.error(f"Error in TranslatorPipeline.process: {e}", exc_info=True)
+            self.logger.error("Error in TranslatorPipeline.process: %s", e, exc_info=True)
             return False
 
-    def _extract_text(self, message: Message) -> Optional[str]:
+    @retry_async(max_attempts=3, delay=1.0, backoff=2.0, jitter='full', max_delay=30.0)
+    async def _translate_text(self, text: str, max_chunk_size: int = 5000) -> Optional[str]:
         """
-        Extract text content from a message.
+        Translate Chinese text to English.
+
+        Google Translate has a character limit, so long texts are split into chunks.
+        Errors propagate so the retry decorator can back off and try again.
 
         Args:
-            message: Telegram message
+            text: Text to translate
+            max_chunk_size: Maximum characters per translation request
 
         Returns:
-            str: Extracted text or None
+            str: Translated text
+
+        Raises:
+            Exception: If translation still fails after retries
         """
-        if message.text:
-            return message.text.strip()
-        elif message.message:
-            return message.message.strip()
-        return None
+        # For short texts, translate directly
+        if len(text) <= max_chunk_size:
+            return await self._translate_chunk(text)
 
-    @retry_async(max_attempts=3, delay=1.0, backoff=2.0)
-    async def _translate_text(self, text: str, max_chunk_size: int = 5000) -> Optional[str]:
+        # For long texts, translate chunks concurrently (bounded); gather keeps their order
+        chunks = self._split_into_chunks(text, max_chunk_size)
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_CHUNKS)
+
+        async def translate_one(chunk: str) -> str:
+            async with semaphore:
+                return await self._translate_chunk(chunk)
+
+        translated_chunks = await asyncio.gather(*(translate_one(chunk) for chunk in chunks))
+
+        return '\n\n'.join(translated_chunks)
+
+    async def _translate_chunk(self, text: str) -> str:
         """
-        Translate Chinese text to English.
+        Translate a single chunk, using the cache and sharing in-flight calls.
 
-        Google Translate has a character limit, so long texts are split into chunks.
+        Args:
+            text: Text to translate (within the translator's size limit)
+
+        Returns:
+            str: Translated text
+        """
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+        cached = self._translation_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Singleflight: identical texts arriving together wait on one call
+        task = self._inflight_translations.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._translate_uncached(key, text))
+            self._inflight_translations[key] = task
+            task.add_done_callback(lambda _: self._inflight_translations.pop(key, None))
+
+        # Shield so one caller's cancellation doesn't cancel the others' call
+        return await asyncio.shield(task)
+
+    async def _translate_uncached(self, key: bytes, text: str) -> str:
+        """
+        Call Google Translate in a worker thread and cache the result.
 
         Args:
+            key: Cache key for the text
             text: Text to translate
-            max_chunk_size: Maximum characters per translation request
 
         Returns:
-            str: Translated text or None if failed
+            str: Translated text
         """
-        try:
-            # For short texts, translate directly
-            if len(text) <= max_chunk_size:
-                import asyncio
-                loop = asyncio.get_event_loop()
-                translated = await loop.run_in_executor(
-                    None,
-                    lambda: self.translator.translate(text)
-                )
-                return translated
-
-            # For long texts, split into chunks
-            chunks = self._split_into_chunks(text, max_chunk_size)
-            translated_chunks = []
-
-            import asyncio
-            loop = asyncio.get_event_loop()
-
-            for chunk in chunks:
-                translated_chunk = await loop.run_in_executor(
-                    None,
-                    lambda c=chunk: self.translator.translate(c)
-                )
-                translated_chunks.append(translated_chunk)
-                # Small delay to avoid rate limiting
-                await asyncio.sleep(0.5)
-
-            return '\n\n'.join(translated_chunks)
+        loop = asyncio.get_running_loop()
+        translated = await loop.run_in_executor(self._xlat_pool, self._translate_sync, text)
+        self._translation_cache.set(key, translated)
+        return translated
 
-        except Exception as e:
-            self.logger.error(f"Translation error: {e}")
-            return None
+    async def close(self, timeout: float = 30.0) -> None:
+        """
+        Drain outgoing messages, then shut down the translation executor.
+
+        Args:
+            timeout: Maximum seconds to wait for the send queue to drain
+        """
+        await super().close(timeout)
+        self._xlat_pool.shutdown(wait=False)
+
+    def _translator(self) -> GoogleTranslator:
+        """
+        Get this thread's translator, creating it on first use.
+
+        Returns:
+            GoogleTranslator: Translator owned by the calling thread
+        """
+        translator = getattr(self._thread_local, 'translator', None)
+        if translator is None:
+            translator = GoogleTranslator(source='zh-CN', target='en')
+            self._thread_local.translator = translator
+        return translator
+
+    def _translate_sync(self, text: str) -> str:
+        """
+        Blocking translation call (runs in the executor).
+
+        Args:
+            text: Text to translate
+
+        Returns:
+            str: Translated text
+        """
+        return self._translator().translate(text)
 
     def _split_into_chunks(self, text: str, max_size: int) -> list[str]:
         """
@@ -146,21 +227,23 @@ class TranslatorPipeline(BasePipeline):
             return [text]
 
         chunks = []
-        current_chunk = ""
-
-        # Split by paragraphs first, then sentences
-        paragraphs = text.split('\n')
-
-        for para in paragraphs:
-            if len(current_chunk) + len(para) + 1 <= max_size:
-                current_chunk += para + '\n'
+        current = []
+        current_len = 0
+
+        # Split by lines; collect each chunk's lines and join once when flushing
+        for para in text.splitlines():
+            para_len = len(para) + 1
+            if current_len + para_len <= max_size:
+                current.append(para)
+                current_len += para_len
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = para + '\n'
+                if current:
+                    chunks.append('\n'.join(current).strip())
+                current = [para]
+                current_len = para_len
 
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        if current:
+            chunks.append('\n'.join(current).strip())
 
         return chunks
 
@@ -177,11 +260,7 @@ class TranslatorPipeline(BasePipeline):
         Returns:
             str: Formatted message in Markdown
         """
-        via_source = self._format_via_source(message)
-
-        return f"""{translated}
-
-from: {via_source}"""
+        return OUTPUT_FORMAT % (translated, self._format_via_source(message))
 
     async def _forward_original(self, message: Message, text: str) -> bool:
         """
@@ -194,6 +273,5 @@ from: {via_source}"""
         Returns:
             bool: True if forwarded successfully
         """
-        via_source = self._format_via_source(message)
-        formatted = f"{text}\n\nfrom: {via_source}"
+        formatted = OUTPUT_FORMAT % (text, self._format_via_source(message))
         return await self.forward_to_target(formatted)
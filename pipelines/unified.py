@@ -1,11 +1,16 @@
+import asyncio
+import hashlib
+import io
 from pathlib import Path
-from typing import Optional, Dict, Any, Union
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List, Optional, Union
 from telethon.tl.types import Message
 
-from .base import BasePipeline
+from .base import OUTPUT_FORMAT, BasePipeline
 from sources.base import SourceMessage
-from services import GeminiService, PDFService
-from utils import detect_chinese
+from services import LLMCache, LLMContext, PDFService, get_gemini_service
+from config import settings
+from utils import LRUCache, detect_chinese, is_pdf_document, safe_filename, sha256_file
 
 
 class UnifiedPipeline(BasePipeline):
@@ -30,10 +35,69 @@ class UnifiedPipeline(BasePipeline):
     Cost: Uses Gemini for all processing (~$0.0001-0.001 per message)
     """
 
+    # Processed documents cached by SHA-256, so a PDF reposted across channels
+    # is only sent to Gemini once
+    DOCUMENT_CACHE_SIZE = 128
+    DOCUMENT_CACHE_TTL = 24 * 3600  # seconds
+
+    # Larger documents are skipped before downloading
+    MAX_DOCUMENT_BYTES = settings.MAX_PDF_SIZE_MB * 1024 * 1024
+
+    # Documents up to this size are downloaded into memory instead of temp files
+    MAX_IN_MEMORY_DOCUMENT_BYTES = 5 * 1024 * 1024
+
+    # Processed texts cached by content, so the same item forwarded by several
+    # channels within a few minutes makes one Gemini call
+    TEXT_CACHE_SIZE = 512
+    TEXT_CACHE_TTL = 300  # seconds
+
+    # Row marshaling (settings.ENABLE_ROW_MARSHALING): short texts arriving
+    # together are processed in one Gemini request
+    ROW_MARSHAL_BATCH = 8
+    ROW_MARSHAL_WAIT = 0.25  # seconds to wait for more texts
+    ROW_MARSHAL_TIMEOUT = 45  # seconds per marshaled request
+    MAX_MARSHAL_CHARS = 2000  # longer texts are always processed on their own
+    MAX_MARSHAL_BATCH_CHARS = 15_000  # total input per marshaled request
+
+    # Noise filter: short texts the same source repeats within
+    # RECENT_SHORT_TEXT_TTL ("gm", heartbeats) and texts with fewer than
+    # MIN_DISTINCT_CHARS distinct letters (emoji-only, "...", "ok") are
+    # dropped without a Gemini call. The distinct-letter check skips texts
+    # with Chinese or digits, so "暴跌" or "100" still get through
+    SHORT_TEXT_CHARS = 80
+    RECENT_SHORT_TEXT_SIZE = 10_000
+    RECENT_SHORT_TEXT_TTL = 3600  # seconds
+    MIN_DISTINCT_CHARS = 3
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.gemini = GeminiService()
+        self.gemini = get_gemini_service()
         self.pdf_service = PDFService()
+        self._document_cache: LRUCache[str] = LRUCache(
+            maxsize=self.DOCUMENT_CACHE_SIZE,
+            ttl=self.DOCUMENT_CACHE_TTL
+        )
+        self._text_cache: LRUCache[str] = LRUCache(
+            maxsize=self.TEXT_CACHE_SIZE,
+            ttl=self.TEXT_CACHE_TTL
+        )
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        self._recent_short_texts: LRUCache[bool] = LRUCache(
+            maxsize=self.RECENT_SHORT_TEXT_SIZE,
+            ttl=self.RECENT_SHORT_TEXT_TTL
+        )
+
+        # Durable cache behind the in-memory ones: survives restarts and
+        # outlives their TTLs
+        self._llm_cache = LLMCache()
+
+        # Cap concurrent Gemini requests; bursts queue here instead of
+        # piling up as 429s on Gemini's side
+        self._gemini_sem = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENCY)
+
+        self._marshal_buffer: List[tuple] = []
+        self._marshal_timer: Optional[asyncio.TimerHandle] = None
+        self._marshal_tasks: set = set()
         self.logger.info("UnifiedPipeline initialized with Gemini service")
 
     async def process(self, message: Union[Message, SourceMessage]) -> bool:
@@ -67,8 +131,9 @@ class UnifiedPipeline(BasePipeline):
             if message.document:
                 return await self._process_document(message)
 
-            # Otherwise process as text message
-            elif message.text or message.message:
+            # Otherwise process as text message. Check the raw text: .text
+            # re-renders the entities to Markdown on every access
+            elif message.message:
                 return await self._process_text(message)
 
             else:
@@ -76,7 +141,7 @@ class UnifiedPipeline(BasePipeline):
                 return False
 
         except Exception as e:
-            self.logger.error(f"Error in UnifiedPipeline.process: {e}", exc_info=True)
+            self.logger.error("Error in UnifiedPipeline.process: %s", e, exc_info=True)
 
             # Try to send error notification
             try:
@@ -87,6 +152,16 @@ class UnifiedPipeline(BasePipeline):
 
             return False
 
+    async def close(self, timeout: float = 30.0) -> None:
+        """
+        Drain outgoing messages, then close the LLM cache.
+
+        Args:
+            timeout: Maximum seconds to wait for the send queue to drain
+        """
+        await super().close(timeout)
+        self._llm_cache.close()
+
     async def _process_text(self, message: Message) -> bool:
         """
         Process text messages using LLM.
@@ -110,7 +185,11 @@ class UnifiedPipeline(BasePipeline):
                 self.logger.debug("No text content in message")
                 return False
 
-            self.logger.info(f"Processing text message ({len(text)} chars)")
+            if self._is_noise(text, str(message.chat_id)):
+                self.logger.debug("Skipping low-content or repeated short text from %s", message.chat_id)
+                return True
+
+            self.logger.info("Processing text message (%d chars)", len(text))
 
             # Detect if Chinese text is present
             has_chinese = detect_chinese(text)
@@ -119,10 +198,7 @@ class UnifiedPipeline(BasePipeline):
             context = self._build_message_context(message, has_chinese)
 
             # Process with LLM
-            processed_content = await self.gemini.process_text_message(
-                text=text,
-                context=context
-            )
+            processed_content = await self._process_text_shared(text, context)
 
             if not processed_content:
                 self.logger.warning("LLM returned empty response")
@@ -138,9 +214,174 @@ class UnifiedPipeline(BasePipeline):
             return await self.forward_to_target(formatted_message)
 
         except Exception as e:
-            self.logger.error(f"Error processing text message: {e}", exc_info=True)
+            self.logger.error("Error processing text message: %s", e, exc_info=True)
             return False
 
+    async def _process_text_shared(self, text: str, context: LLMContext) -> Optional[str]:
+        """
+        Run text through the LLM, sharing the result between identical texts.
+
+        Concurrent calls for the same text wait on one Gemini request, and the
+        result is reused for TEXT_CACHE_TTL seconds. Callers still format the
+        output per message, so the source footer stays correct.
+
+        Args:
+            text: Message text
+            context: LLM context for the first message carrying this text
+
+        Returns:
+            str: Processed content, or None if the LLM returned nothing
+        """
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+        cached = self._text_cache.get(key)
+        if cached is not None:
+            self.logger.info("Text cache hit, skipping Gemini")
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._process_text_uncached(key, text, context))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one caller's cancellation doesn't cancel the shared request
+        return await asyncio.shield(task)
+
+    async def _process_text_uncached(self, key: bytes, text: str, context: LLMContext) -> Optional[str]:
+        """
+        Call Gemini for a text and cache a non-empty result under key.
+
+        The persistent LLM cache is checked first; fresh results are written
+        to both caches.
+        """
+        llm_key = 'text:' + key.hex()
+        processed_content = await self._llm_cache.get(llm_key)
+        if processed_content is not None:
+            self.logger.info("LLM cache hit, skipping Gemini")
+            self._text_cache.set(key, processed_content)
+            return processed_content
+
+        if settings.ENABLE_ROW_MARSHALING and len(text) <= self.MAX_MARSHAL_CHARS:
+            processed_content = await self._marshal_text(text, context)
+        else:
+            processed_content = await self._call_gemini(
+                lambda: self.gemini.process_text_message(text=text, context=context)
+            )
+        if processed_content:
+            self._text_cache.set(key, processed_content)
+            await self._llm_cache.set(llm_key, processed_content)
+        return processed_content
+
+    async def _marshal_text(self, text: str, context: LLMContext) -> Optional[str]:
+        """
+        Queue a short text for the next marshaled Gemini request.
+
+        The batch is sent when ROW_MARSHAL_BATCH texts are waiting or
+        ROW_MARSHAL_WAIT seconds after the first one arrived, whichever is
+        first, or earlier if this text would push it past MAX_MARSHAL_BATCH_CHARS.
+
+        Args:
+            text: Message text
+            context: LLM context
+
+        Returns:
+            str: Processed content for this text
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        # Very long prompts answer disproportionately slowly; start a new
+        # batch rather than exceed the size cap
+        buffered = sum(len(queued) for queued, _, _ in self._marshal_buffer)
+        if buffered and buffered + len(text) > self.MAX_MARSHAL_BATCH_CHARS:
+            self._flush_marshal_buffer()
+
+        self._marshal_buffer.append((text, context, future))
+
+        if len(self._marshal_buffer) >= self.ROW_MARSHAL_BATCH:
+            self._flush_marshal_buffer()
+        elif len(self._marshal_buffer) == 1:
+            self._marshal_timer = loop.call_later(self.ROW_MARSHAL_WAIT, self._flush_marshal_buffer)
+
+        return await future
+
+    def _flush_marshal_buffer(self) -> None:
+        """
+        Send whatever texts are waiting as one marshaled request.
+        """
+        # Cancel the pending wait timer so it can't flush the next batch early
+        if self._marshal_timer is not None:
+            self._marshal_timer.cancel()
+            self._marshal_timer = None
+
+        if not self._marshal_buffer:
+            return
+
+        batch, self._marshal_buffer = self._marshal_buffer, []
+        task = asyncio.create_task(self._run_marshaled(batch))
+        self._marshal_tasks.add(task)
+        task.add_done_callback(self._marshal_tasks.discard)
+
+    async def _run_marshaled(self, batch: List[tuple]) -> None:
+        """
+        Process a batch of texts in one request and resolve each caller.
+
+        Falls back to one request per text if the batch call fails or its
+        response can't be split back into per-message results.
+
+        Args:
+            batch: (text, context, future) tuples
+        """
+        results = None
+        if len(batch) > 1:
+            try:
+                results = await self._call_gemini(
+                    lambda: self.gemini.process_text_batch(
+                        [(text, context) for text, context, _ in batch],
+                        timeout=self.ROW_MARSHAL_TIMEOUT
+                    )
+                )
+            except Exception as e:
+                self.logger.warning("Marshaled Gemini request failed, processing %d texts individually: %s", len(batch), e)
+
+        if results is None:
+            results = await asyncio.gather(
+                *(
+                    self._call_gemini(
+                        lambda text=text, context=context: self.gemini.process_text_message(text=text, context=context)
+                    )
+                    for text, context, _ in batch
+                ),
+                return_exceptions=True
+            )
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _call_gemini(self, call: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """
+        Run a Gemini request under the pipeline's concurrency cap.
+
+        GeminiService owns deadlines (GEMINI_REQUEST_TIMEOUT /
+        GEMINI_DOCUMENT_TIMEOUT, enforced by the transport) and retries, so
+        the slot is held until the request has really finished and
+        GEMINI_MAX_CONCURRENCY bounds requests actually in flight.
+
+        Args:
+            call: Zero-argument factory returning the request coroutine
+
+        Returns:
+            str: The request's result
+        """
+        async with self._gemini_sem:
+            return await call()
+
     async def _process_document(self, message: Message) -> bool:
         """
         Process document messages (PDFs, images, etc.) using LLM.
@@ -157,34 +398,66 @@ class UnifiedPipeline(BasePipeline):
         Returns:
             bool: True if successful
         """
-        pdf_path = None
+        pdf = None
 
         try:
             # Verify it's a PDF (can be extended to other document types)
-            mime_type = message.document.mime_type
-            filename = message.file.name if message.file else 'document.pdf'
-
-            if not (mime_type == 'application/pdf' or filename.endswith('.pdf')):
-                self.logger.debug(f"Not a PDF document: {mime_type}, skipping")
+            # and worth downloading, using only the document's metadata
+            document = message.document
+            mime_type = document.mime_type
+            filename = (message.file.name if message.file else None) or ''
+
+            # Voice notes, stickers, GIFs etc. have no filename; check the real
+            # name so they aren't mistaken for PDFs
+            if not is_pdf_document(mime_type, filename):
+                self.logger.debug("Not a PDF document: %s, skipping", mime_type)
                 return False
+            filename = filename or 'document.pdf'
 
-            self.logger.info(f"Processing PDF document: {filename}")
+            size = document.size or 0
+            if size <= 0:
+                self.logger.warning("Empty PDF document, skipping: %s", filename)
+                return False
+            if size > self.MAX_DOCUMENT_BYTES:
+                self.logger.warning(
+                    "PDF too large, skipping: %s (%.1fMB, max: %sMB)",
+                    filename, size / (1024 * 1024), settings.MAX_PDF_SIZE_MB
+                )
+                return False
 
-            # Download the PDF
-            pdf_path = await self._download_pdf_from_message(message, filename)
+            self.logger.info("Processing PDF document: %s", filename)
 
-            # Build context for LLM
+            # Build context for LLM (doesn't depend on the download)
             context = self._build_message_context(message, has_chinese=False)
 
-            # Process with LLM (multimodal - analyzes text + visuals)
-            processed_content = await self.gemini.process_document(
-                file_path=pdf_path,
-                context=context
-            )
-
-            if not processed_content:
-                self.logger.warning("LLM returned empty response for document")
-                return False
+            # Download the PDF, hashing it as it streams in
+            hasher = hashlib.sha256()
+            pdf = await self._download_pdf_from_message(message, filename, hasher)
+            digest = hasher.hexdigest()
+
+            processed_content = self._document_cache.get(digest)
+            if processed_content is None:
+                processed_content = await self._llm_cache.get('pdf:' + digest)
+            if processed_content is not None:
+                self.logger.info("Document cache hit for %s", filename)
+                self._document_cache.set(digest, processed_content)
+            else:
+                # Process with LLM (multimodal - analyzes text + visuals)
+                processed_content = await self._call_gemini(
+                    lambda: self.gemini.process_document(
+                        file_path=pdf,
+                        context=context,
+                        mime_type='application/pdf',
+                        digest=digest
+                    )
+                )
+
+                if not processed_content:
+                    self.logger.warning("LLM returned empty response for document")
+                    return False
+
+                self._document_cache.set(digest, processed_content)
+                await self._llm_cache.set('pdf:' + digest, processed_content)
 
             # Format and forward with PDF attached
             formatted_message = self._format_output(
@@ -193,85 +466,114 @@ class UnifiedPipeline(BasePipeline):
                 content_type="document"
             )
 
+            if isinstance(pdf, Path):
+                attachment = str(pdf)
+            else:
+                pdf.seek(0)
+                attachment = pdf
+
             success = await self.forward_to_target(
                 text=formatted_message,
-                file_path=str(pdf_path)
+                file_path=attachment
             )
 
             return success
 
         except Exception as e:
-            self.logger.error(f"Error processing document: {e}", exc_info=True)
+            self.logger.error("Error processing document: %s", e, exc_info=True)
             return False
 
         finally:
-            # Always cleanup temporary files
-            if pdf_path:
-                await self.pdf_service.cleanup_file(pdf_path)
-
-    async def _download_pdf_from_message(self, message: Message, filename: str) -> Path:
+            # Always cleanup temporary files (in-memory buffers just get closed)
+            if isinstance(pdf, Path):
+                await self.pdf_service.cleanup_file(pdf)
+            elif pdf is not None:
+                pdf.close()
+
+    async def _download_pdf_from_message(self, message: Message, filename: str,
+                                         hasher=None) -> Union[io.BytesIO, Path]:
         """
         Download PDF from Telegram message.
 
+        Documents up to MAX_IN_MEMORY_DOCUMENT_BYTES are downloaded into a
+        BytesIO, skipping the temp-file write, re-read and delete; larger
+        ones are streamed to a file in the temp directory.
+
         Args:
             message: Telegram message with document
             filename: Target filename
+            hasher: Optional hashlib object fed the downloaded bytes
 
         Returns:
-            Path: Path to downloaded file
+            BytesIO or Path: The downloaded PDF
 
         Raises:
             Exception: If download fails
         """
-        from utils import safe_filename
-
         safe_name = safe_filename(filename)
-        file_path = self.pdf_service.temp_dir / safe_name
 
         try:
-            await self.client.download_media(message.document, file=str(file_path))
-            self.logger.info(f"Downloaded PDF: {safe_name}")
+            if (message.document.size or 0) <= self.MAX_IN_MEMORY_DOCUMENT_BYTES:
+                buffer = io.BytesIO()
+                buffer.name = safe_name  # Telethon uses this as the upload filename
+                await self.client.download_media(message.document, file=buffer)
+                if hasher is not None:
+                    await asyncio.to_thread(hasher.update, buffer.getbuffer())
+                buffer.seek(0)
+                self.logger.info("Downloaded PDF into memory: %s", safe_name)
+                return buffer
+
+            file_path = self.pdf_service.temp_dir / safe_name
+            await self.pdf_service.download_document(self.client, message.document, file_path, hasher)
+            self.logger.info("Downloaded PDF: %s", safe_name)
             return file_path
 
         except Exception as e:
-            self.logger.error(f"Failed to download PDF: {e}")
+            self.logger.error("Failed to download PDF: %s", e)
             raise
 
-    def _extract_text(self, message: Message) -> Optional[str]:
+    def _build_message_context(self, message: Message, has_chinese: bool = False) -> LLMContext:
         """
-        Extract text content from a message.
+        Build contextual information about the message for LLM processing.
+
+        The chat-level parts come from the per-chat attribution cache; only
+        the link's message ID and has_chinese vary per message.
 
         Args:
             message: Telegram message
+            has_chinese: Whether Chinese text was detected
 
         Returns:
-            str: Extracted text or None
+            LLMContext: Context information
         """
-        if message.text:
-            return message.text.strip()
-        elif message.message:
-            return message.message.strip()
-        return None
+        source_name, link_prefix = self._chat_attribution(message)
+
+        return LLMContext(
+            source_channel=source_name,
+            channel_id=message.chat_id,
+            has_chinese=has_chinese,
+            message_link=f"{link_prefix}{message.id}" if link_prefix else None,
+        )
 
-    def _build_message_context(self, message: Message, has_chinese: bool = False) -> Dict[str, Any]:
+    @staticmethod
+    def _build_source_context(source_msg: SourceMessage, has_chinese: bool = False) -> LLMContext:
         """
-        Build contextual information about the message for LLM processing.
+        Build contextual information about a SourceMessage for LLM processing.
 
         Args:
-            message: Telegram message
+            source_msg: SourceMessage being processed
             has_chinese: Whether Chinese text was detected
 
         Returns:
-            dict: Context information
+            LLMContext: Context information
         """
-        source_name = self._get_source_info(message)
-
-        return {
-            "source_channel": source_name,
-            "channel_id": message.chat_id,
-            "has_chinese": has_chinese,
-            "message_link": self._get_message_link(message),
-        }
+        return LLMContext(
+            source_channel=source_msg.source_name,
+            channel_id=source_msg.source_id,
+            has_chinese=has_chinese,
+            message_link=source_msg.url,
+            metadata=source_msg.metadata,
+        )
 
     def _format_output(self, content: str, message: Message, content_type: str) -> str:
         """
@@ -285,11 +587,7 @@ class UnifiedPipeline(BasePipeline):
         Returns:
             str: Formatted message in Markdown
         """
-        via_source = self._format_via_source(message)
-
-        return f"""{content}
-
-from: {via_source}"""
+        return OUTPUT_FORMAT % (content, self._format_via_source(message))
 
     # ========================================
     # Modular Source Architecture Support
@@ -315,11 +613,11 @@ from: {via_source}"""
             elif source_msg.has_text():
                 return await self._process_source_text(source_msg)
             else:
-                self.logger.debug(f"SourceMessage from {source_msg.source_name} has no processable content")
+                self.logger.debug("SourceMessage from %s has no processable content", source_msg.source_name)
                 return False
 
         except Exception as e:
-            self.logger.error(f"Error processing SourceMessage from {source_msg.source_name}: {e}", exc_info=True)
+            self.logger.error("Error processing SourceMessage from %s: %s", source_msg.source_name, e, exc_info=True)
             return False
 
     async def _process_source_text(self, source_msg: SourceMessage) -> bool:
@@ -332,72 +630,66 @@ from: {via_source}"""
         Returns:
             bool: True if successful
         """
-        import time
-        start_time = time.time()
+        log = self.logger
+        start_time = perf_counter()
 
         try:
             text = source_msg.text
             if not text:
                 return False
 
-            self.logger.info(f"⏱️ [TIMING] Processing text from {source_msg.source_name} ({len(text)} chars)")
+            # Handled, just not worth forwarding; not a failure
+            if self._is_noise(text, source_msg.source_id):
+                log.debug("Skipping low-content or repeated short text from %s", source_msg.source_name)
+                return True
+
+            log.info("⏱️ [TIMING] Processing text from %s (%d chars)", source_msg.source_name, len(text))
 
             # Detect if Chinese text is present
             has_chinese = detect_chinese(text)
 
             # Build context for LLM
-            context = {
-                "source_channel": source_msg.source_name,
-                "channel_id": source_msg.source_id,
-                "has_chinese": has_chinese,
-                "message_link": source_msg.url,
-                "metadata": source_msg.metadata
-            }
+            context = self._build_source_context(source_msg, has_chinese)
 
             # Process with LLM
-            llm_start = time.time()
-            self.logger.info(f"⏱️ [TIMING] Calling Gemini API...")
-            processed_content = await self.gemini.process_text_message(
-                text=text,
-                context=context
-            )
-            llm_time = time.time() - llm_start
-            self.logger.info(f"⏱️ [TIMING] Gemini API call took {llm_time:.2f}s")
+            llm_start = perf_counter()
+            processed_content = await self._process_text_shared(text, context)
+            llm_time = perf_counter() - llm_start
 
             if not processed_content:
-                self.logger.warning("LLM returned empty response")
+                log.warning("LLM returned empty response")
                 return False
 
             # Format output
-            format_start = time.time()
+            format_start = perf_counter()
             formatted_message = self._format_source_output(
                 content=processed_content,
                 source_msg=source_msg,
                 content_type="text"
             )
-            format_time = time.time() - format_start
+            format_time = perf_counter() - format_start
 
             # Get the appropriate output channel based on source
-            from config import settings
-            # Extract source channel ID from metadata
-            source_channel_id = source_msg.metadata.get('chat_id') if source_msg.metadata else None
-            target_channel = settings.get_output_channel(source_channel_id) if source_channel_id else None
+            target_channel = self._source_target_channel(source_msg)
 
             # Forward to target
-            forward_start = time.time()
+            forward_start = perf_counter()
             result = await self.forward_to_target(formatted_message, target_channel=target_channel)
-            forward_time = time.time() - forward_start
+            forward_time = perf_counter() - forward_start
 
             if target_channel:
-                self.logger.info(f"📤 Routed to {target_channel} based on source {source_msg.source_name}")
+                log.info("📤 Routed to %s based on source %s", target_channel, source_msg.source_name)
 
-            total_time = time.time() - start_time
-            self.logger.info(f"⏱️ [TIMING] Text processing complete: LLM={llm_time:.2f}s, Format={format_time:.2f}s, Forward={forward_time:.2f}s, Total={total_time:.2f}s")
+            # One summary line; arguments are only formatted if INFO is enabled
+            log.info(
+                "⏱️ [TIMING] Text processing complete: LLM=%.2fs, Format=%.4fs, Forward=%.2fs, Total=%.2fs",
+                llm_time, format_time, forward_time, perf_counter() - start_time
+            )
 
             return result
 
         except Exception as e:
-            self.logger.error(f"Error processing source text: {e}", exc_info=True)
+            self.logger.error("Error processing source text: %s", e, exc_info=True)
             return False
 
     async def _process_source_document(self, source_msg: SourceMessage) -> bool:
@@ -415,31 +707,53 @@ from: {via_source}"""
                 self.logger.warning("SourceMessage has no document_path")
                 return False
 
-            self.logger.info(f"Processing document from {source_msg.source_name}: {source_msg.document_path.name}")
+            self.logger.info("Processing document from %s: %s", source_msg.source_name, source_msg.document_path.name)
 
-            # Check if it's a PDF
-            if source_msg.document_mime_type != 'application/pdf':
-                self.logger.debug(f"Not a PDF: {source_msg.document_mime_type}, skipping")
+            # Check if it's a PDF (sources download by MIME type or filename)
+            if not is_pdf_document(source_msg.document_mime_type, source_msg.document_path.name):
+                self.logger.debug("Not a PDF: %s, skipping", source_msg.document_mime_type)
                 return False
 
             # Build context
-            context = {
-                "source_channel": source_msg.source_name,
-                "channel_id": source_msg.source_id,
-                "has_chinese": False,
-                "message_link": source_msg.url,
-                "metadata": source_msg.metadata
-            }
-
-            # Process with LLM
-            processed_content = await self.gemini.process_document(
-                file_path=source_msg.document_path,
-                context=context
-            )
-
-            if not processed_content:
-                self.logger.warning("LLM returned empty response for document")
-                return False
+            context = self._build_source_context(source_msg)
+
+            # Reuse an earlier result for the same PDF. TelegramSource hashes
+            # while downloading; other sources are hashed here (blocking I/O)
+            digest = (source_msg.metadata or {}).get('document_sha256')
+            if digest is None:
+                digest = await asyncio.to_thread(sha256_file, source_msg.document_path)
+            processed_content = self._document_cache.get(digest)
+            if processed_content is None:
+                processed_content = await self._llm_cache.get('pdf:' + digest)
+
+            if processed_content is not None:
+                self.logger.info("Document cache hit for %s", source_msg.document_path.name)
+                self._document_cache.set(digest, processed_content)
+            else:
+                # Send Gemini a compacted copy if enabled; the original is forwarded
+                gemini_path = source_msg.document_path
+                if settings.ENABLE_PDF_COMPACTION:
+                    gemini_path = await self.pdf_service.compact(gemini_path)
+
+                # Process with LLM
+                try:
+                    processed_content = await self._call_gemini(
+                        lambda: self.gemini.process_document(
+                            file_path=gemini_path,
+                            context=context,
+                            digest=digest
+                        )
+                    )
+                finally:
+                    if gemini_path != source_msg.document_path:
+                        await self.pdf_service.cleanup_file(gemini_path)
+
+                if not processed_content:
+                    self.logger.warning("LLM returned empty response for document")
+                    return False
+
+                self._document_cache.set(digest, processed_content)
+                await self._llm_cache.set('pdf:' + digest, processed_content)
 
             # Format output
             formatted_message = self._format_source_output(
@@ -449,9 +763,7 @@ from: {via_source}"""
             )
 
             # Get the appropriate output channel based on source
-            from config import settings
-            source_channel_id = source_msg.metadata.get('chat_id') if source_msg.metadata else None
-            target_channel = settings.get_output_channel(source_channel_id) if source_channel_id else None
+            target_channel = self._source_target_channel(source_msg)
 
             # Forward with document attached
             success = await self.forward_to_target(
@@ -461,14 +773,55 @@ from: {via_source}"""
             )
 
             if target_channel:
-                self.logger.info(f"📤 Routed document to {target_channel} based on source {source_msg.source_name}")
+                self.logger.info("📤 Routed document to %s based on source %s", target_channel, source_msg.source_name)
 
             return success
 
         except Exception as e:
-            self.logger.error(f"Error processing source document: {e}", exc_info=True)
+            self.logger.error("Error processing source document: %s", e, exc_info=True)
+            return False
+
+    def _is_noise(self, text: str, source_id: str) -> bool:
+        """
+        Check whether a text isn't worth a Gemini call.
+
+        Repeats are tracked per source, so a headline another channel posts
+        still goes through (and is served from the text cache).
+
+        Args:
+            text: Message text
+            source_id: Source the text came from
+
+        Returns:
+            bool: True for low-content text or a short text this source sent recently
+        """
+        stripped = text.strip()
+        if (not detect_chinese(stripped) and not any(ch.isdigit() for ch in stripped)
+                and sum(ch.isalnum() for ch in set(stripped)) < self.MIN_DISTINCT_CHARS):
+            return True
+        if len(stripped) >= self.SHORT_TEXT_CHARS:
             return False
 
+        key = hashlib.blake2b(f"{source_id}\0{stripped}".encode('utf-8'), digest_size=8).digest()
+        if key in self._recent_short_texts:
+            return True
+        self._recent_short_texts.set(key, True)
+        return False
+
+    @staticmethod
+    def _source_target_channel(source_msg: SourceMessage) -> Optional[str]:
+        """
+        Get the output channel for a SourceMessage from its source chat.
+
+        Args:
+            source_msg: SourceMessage whose metadata may carry a chat_id
+
+        Returns:
+            str: Routed output channel, or None to use the default target
+        """
+        source_channel_id = source_msg.metadata.get('chat_id') if source_msg.metadata else None
+        return settings.get_output_channel(source_channel_id) if source_channel_id else None
+
     def _format_source_output(self, content: str, source_msg: SourceMessage, content_type: str) -> str:
         """
         Format processed content from a SourceMessage.
@@ -482,8 +835,4 @@ from: {via_source}"""
             str: Formatted message in Markdown
         """
         # Use SourceMessage's built-in link formatting
-        via_source = source_msg.get_source_link()
-
-        return f"""{content}
-
-from: {via_source}"""
+        return OUTPUT_FORMAT % (content, source_msg.source_link)
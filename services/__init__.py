@@ -1,6 +1,7 @@
-from .gemini_service import GeminiService
+from .gemini_service import GeminiService, LLMContext, get_gemini_service
 from .pdf_service import PDFService
+from .llm_cache import LLMCache
 from .status_reporter import StatusReporter
 from .daily_summary_service import DailySummaryService
 
-__all__ = ['GeminiService', 'PDFService', 'StatusReporter', 'DailySummaryService']
+__all__ = ['GeminiService', 'LLMContext', 'get_gemini_service', 'PDFService', 'LLMCache', 'StatusReporter', 'DailySummaryService']
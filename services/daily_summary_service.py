@@ -15,10 +15,71 @@ from telethon.tl.types import Message
 
 from config import settings
 from utils import get_logger
-from services import GeminiService
+from services import get_gemini_service
 
 logger = get_logger(__name__)
 
+# Daily summary prompt, filled in by _build_summary_prompt
+_SUMMARY_PROMPT_TEMPLATE = """# Role: Market Intelligence Summarization Analyst
+
+**Objective:** Extract KEY INSIGHTS (not just observations) from {channel_name} intelligence with source attribution.
+
+**Context:**
+- Channel: {channel_name}
+- Time Period: Past 24 hours
+- Total Messages: {message_count}
+- Date: {date}
+
+---
+
+## Output Format
+
+You MUST output in this exact format:
+
+**Key Insights:**
+- [Actionable insight with specific data/implications] [source message numbers]
+- [Actionable insight with specific data/implications] [source message numbers]
+- [Actionable insight with specific data/implications] [source message numbers]
+
+**Example of GOOD insights (not mere observations):**
+- **BTC** ETF inflows hit $500M, signaling institutional rotation from bonds [1][3]
+- SEC expected to provide crypto clarity Q1 2025, potentially bullish for alts [2][5]
+- **ETH** staking yields compressed to 3.2%, making DeFi protocols more competitive [4]
+
+---
+
+## Critical Instructions:
+
+1. **Insights Not Observations:** Extract WHY something matters, implications, connections
+2. **Source Attribution:** After each point, cite message numbers like [1][2][3]
+3. **Consolidate:** Group related info from multiple messages into one insight
+4. **Prioritize Actionability:** Most important/tradeable insights first
+5. **Be Specific:** Include exact numbers, dates, tickers, percentages
+6. **Maximum 3000 characters:** CRITICAL - keep output under 3000 chars total
+7. **No sections/headers:** Just bullet points starting with "-"
+8. **Bold key terms:** Use **bold** for tickers, companies, important numbers
+
+**What makes a GOOD insight:**
+- Shows cause/effect relationships
+- Highlights market implications
+- Identifies divergences or anomalies
+- Connects dots across multiple data points
+- Flags risks or opportunities
+
+**Tone:** Analytical, insight-driven, zero fluff
+**Length:** 15-25 bullet points, under 3000 characters total
+
+---
+
+## Messages to Summarize:
+
+{messages_text}
+
+---
+
+Generate the point-form summary now. Remember: bullets only, cite sources, maximum 3500 characters.
+"""
+
 
 class DailySummaryService:
     """
@@ -36,7 +97,7 @@ class DailySummaryService:
             client: Authenticated Telegram client
         """
         self.client = client
-        self.gemini = GeminiService()
+        self.gemini = get_gemini_service()
 
         # Output channels to monitor and summarize
         self.crypto_channel = settings.CRYPTO_OUTPUT_CHANNEL
@@ -48,6 +109,9 @@ class DailySummaryService:
         """
         Generate and send daily summaries for both crypto and equities channels.
 
+        The two channels are summarized concurrently; a failure in one
+        (already logged by _generate_channel_summary) doesn't stop the other.
+
         Returns:
             bool: True if summaries were generated successfully
         """
@@ -56,23 +120,22 @@ class DailySummaryService:
             logger.info("GENERATING DAILY SUMMARIES")
             logger.info("=" * 60)
 
-            # Generate summary for crypto channel
-            await self._generate_channel_summary(
-                channel=self.crypto_channel,
-                channel_name="Crypto"
+            results = await asyncio.gather(
+                self._generate_channel_summary(channel=self.crypto_channel, channel_name="Crypto"),
+                self._generate_channel_summary(channel=self.equities_channel, channel_name="Equities"),
+                return_exceptions=True
             )
 
-            # Generate summary for equities channel
-            await self._generate_channel_summary(
-                channel=self.equities_channel,
-                channel_name="Equities"
-            )
+            failed = sum(1 for result in results if isinstance(result, BaseException))
+            if failed:
+                logger.warning("%d/%d daily summaries failed", failed, len(results))
+                return False
 
             logger.info("Daily summaries generated successfully")
             return True
 
         except Exception as e:
-            logger.error(f"Error generating daily summaries: {e}", exc_info=True)
+            logger.error("Error generating daily summaries: %s", e, exc_info=True)
             return False
 
     async def _generate_channel_summary(
@@ -88,20 +151,20 @@ class DailySummaryService:
             channel_name: Human-readable channel name for logging
         """
         try:
-            logger.info(f"Generating summary for {channel_name} channel ({channel})...")
+            logger.info("Generating summary for %s channel (%s)...", channel_name, channel)
 
             # Retrieve messages from the past 24 hours
             messages = await self._get_channel_messages(channel, hours=24)
 
             if not messages:
-                logger.info(f"No messages found in {channel_name} channel for the past 24 hours")
+                logger.info("No messages found in %s channel for the past 24 hours", channel_name)
 
                 # Send a message indicating no activity
                 summary = self._format_no_activity_message(channel_name)
                 await self.client.send_message(channel, summary)
                 return
 
-            logger.info(f"Retrieved {len(messages)} messages from {channel_name} channel")
+            logger.info("Retrieved %d messages from %s channel", len(messages), channel_name)
 
             # Generate summary using LLM
             summary = await self._create_summary(messages, channel_name)
@@ -109,10 +172,10 @@ class DailySummaryService:
             # Split and send the summary to the channel (Telegram limit: 4096 chars)
             await self._send_long_message(channel, summary)
 
-            logger.info(f"✓ Sent daily summary to {channel_name} channel")
+            logger.info("✓ Sent daily summary to %s channel", channel_name)
 
         except Exception as e:
-            logger.error(f"Error generating summary for {channel_name} channel: {e}", exc_info=True)
+            logger.error("Error generating summary for %s channel: %s", channel_name, e, exc_info=True)
             raise
 
     async def _send_long_message(self, channel: str, message: str) -> None:
@@ -133,35 +196,44 @@ class DailySummaryService:
             await self.client.send_message(channel, message)
             return
 
-        # Split long messages into multiple parts
+        # Split long messages into multiple parts. The current part is built
+        # up as a list of pieces (joined once it's full) with its length
+        # tracked alongside, instead of re-copying a growing string
         parts = []
-        current_part = ""
+        current_part: List[str] = []
+        current_len = 0
 
         # Split by paragraphs (double newline)
         paragraphs = message.split('\n\n')
 
         for paragraph in paragraphs:
             # If adding this paragraph exceeds the limit, save current part and start new one
-            if len(current_part) + len(paragraph) + 2 > MAX_LENGTH:
-                if current_part:
-                    parts.append(current_part)
-                    current_part = paragraph
+            if current_len + len(paragraph) + 2 > MAX_LENGTH:
+                if current_len:
+                    parts.append(''.join(current_part))
+                    current_part, current_len = [paragraph], len(paragraph)
                 else:
                     # Single paragraph is too long, split by single newlines
                     lines = paragraph.split('\n')
                     for line in lines:
-                        if len(current_part) + len(line) + 1 > MAX_LENGTH:
-                            if current_part:
-                                parts.append(current_part)
-                            current_part = line
+                        if current_len + len(line) + 1 > MAX_LENGTH:
+                            if current_len:
+                                parts.append(''.join(current_part))
+                            current_part, current_len = [line], len(line)
+                        elif current_len:
+                            current_part += ('\n', line)
+                            current_len += 1 + len(line)
                         else:
-                            current_part += '\n' + line if current_part else line
+                            current_part, current_len = [line], len(line)
+            elif current_len:
+                current_part += ('\n\n', paragraph)
+                current_len += 2 + len(paragraph)
             else:
-                current_part += '\n\n' + paragraph if current_part else paragraph
+                current_part, current_len = [paragraph], len(paragraph)
 
         # Add the last part
-        if current_part:
-            parts.append(current_part)
+        if current_len:
+            parts.append(''.join(current_part))
 
         # Send all parts
         for i, part in enumerate(parts, 1):
@@ -182,7 +254,7 @@ class DailySummaryService:
             if i < len(parts):
                 await asyncio.sleep(1)
 
-        logger.info(f"Sent long message in {len(parts)} parts")
+        logger.info("Sent long message in %d parts", len(parts))
 
     async def _get_channel_messages(
         self,
@@ -226,12 +298,12 @@ class DailySummaryService:
             # Sort messages chronologically (oldest first)
             messages.sort(key=lambda m: m.date)
 
-            logger.info(f"Retrieved {len(messages)} messages from past {hours} hours")
+            logger.info("Retrieved %d messages from past %s hours", len(messages), hours)
 
             return messages
 
         except Exception as e:
-            logger.error(f"Error retrieving messages from {channel}: {e}", exc_info=True)
+            logger.error("Error retrieving messages from %s: %s", channel, e, exc_info=True)
             return []
 
     async def _create_summary(
@@ -266,7 +338,7 @@ class DailySummaryService:
                 messages_text=combined_text
             )
 
-            logger.info(f"Sending {len(messages)} messages to LLM for summarization...")
+            logger.info("Sending %d messages to LLM for summarization...", len(messages))
 
             # Generate summary using Gemini
             loop = asyncio.get_event_loop()
@@ -290,7 +362,7 @@ class DailySummaryService:
             return full_summary
 
         except Exception as e:
-            logger.error(f"Error creating summary: {e}", exc_info=True)
+            logger.error("Error creating summary: %s", e, exc_info=True)
             raise
 
     def _build_summary_prompt(
@@ -310,65 +382,12 @@ class DailySummaryService:
         Returns:
             Formatted prompt for Gemini
         """
-        return f"""# Role: Market Intelligence Summarization Analyst
-
-**Objective:** Extract KEY INSIGHTS (not just observations) from {channel_name} intelligence with source attribution.
-
-**Context:**
-- Channel: {channel_name}
-- Time Period: Past 24 hours
-- Total Messages: {message_count}
-- Date: {datetime.now().strftime('%Y-%m-%d')}
-
----
-
-## Output Format
-
-You MUST output in this exact format:
-
-**Key Insights:**
-- [Actionable insight with specific data/implications] [source message numbers]
-- [Actionable insight with specific data/implications] [source message numbers]
-- [Actionable insight with specific data/implications] [source message numbers]
-
-**Example of GOOD insights (not mere observations):**
-- **BTC** ETF inflows hit $500M, signaling institutional rotation from bonds [1][3]
-- SEC expected to provide crypto clarity Q1 2025, potentially bullish for alts [2][5]
-- **ETH** staking yields compressed to 3.2%, making DeFi protocols more competitive [4]
-
----
-
-## Critical Instructions:
-
-1. **Insights Not Observations:** Extract WHY something matters, implications, connections
-2. **Source Attribution:** After each point, cite message numbers like [1][2][3]
-3. **Consolidate:** Group related info from multiple messages into one insight
-4. **Prioritize Actionability:** Most important/tradeable insights first
-5. **Be Specific:** Include exact numbers, dates, tickers, percentages
-6. **Maximum 3000 characters:** CRITICAL - keep output under 3000 chars total
-7. **No sections/headers:** Just bullet points starting with "-"
-8. **Bold key terms:** Use **bold** for tickers, companies, important numbers
-
-**What makes a GOOD insight:**
-- Shows cause/effect relationships
-- Highlights market implications
-- Identifies divergences or anomalies
-- Connects dots across multiple data points
-- Flags risks or opportunities
-
-**Tone:** Analytical, insight-driven, zero fluff
-**Length:** 15-25 bullet points, under 3000 characters total
-
----
-
-## Messages to Summarize:
-
-{messages_text}
-
----
-
-Generate the point-form summary now. Remember: bullets only, cite sources, maximum 3500 characters.
-"""
+        return _SUMMARY_PROMPT_TEMPLATE.format_map({
+            'channel_name': channel_name,
+            'message_count': message_count,
+            'date': datetime.now().strftime('%Y-%m-%d'),
+            'messages_text': messages_text,
+        })
 
     def _format_no_activity_message(self, channel_name: str) -> str:
         """
@@ -1,15 +1,111 @@
 import asyncio
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from datetime import timedelta
 from pathlib import Path
-from typing import Any, Optional
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
 
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
 from config import settings
-from utils import get_logger, retry_async
+from utils import LRUCache, get_logger, retry_async
 
 logger = get_logger(__name__)
 
+_SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+}
+
+# Lifetime of the cached analyst prompt; it's recreated shortly before expiry
+ANALYST_CACHE_TTL = 3600  # seconds
+ANALYST_CACHE_REFRESH_MARGIN = 60  # seconds
+
+# Single-message text prompt; the Chinese variant adds a translation step
+_TEXT_PROMPT_TEMPLATE = """# Role: Market Intelligence Analyst{role_suffix}
+
+**Source:** {source_channel}
+
+**Task:** Process the following message for a professional investor.{task_note}
+
+**Instructions:**
+{instructions}
+
+**Output Format:**
+**Headline:** [One bold sentence summarizing the key news]
+
+• [Key point 1 with specific data/numbers]
+• [Key point 2 with specific data/numbers]
+• [Key point 3 - only if essential]
+
+**Rules:**
+- Start with a bold headline sentence (max 15 words)
+- Use bullet points (•) for key facts
+- Include specific numbers, amounts, dates, valuations
+- NO fluff or background context - facts only
+- Maximum 3 bullet points
+- Be direct and factual
+
+**Tone:** Telegraph-style brevity - no fluff
+**Length:** 100-150 words maximum
+
+---
+
+**Message to process:**
+
+{text}
+"""
+
+_TEXT_PROMPT_VARIANTS = {
+    True: {
+        'role_suffix': ' & Translator',
+        'task_note': ' The message contains Chinese text.',
+        'instructions': (
+            "1. **Translate** the Chinese text to English (if present)\n"
+            "2. **Extract** the most critical facts and numbers only\n"
+            "3. **Format** exactly as specified below"
+        ),
+    },
+    False: {
+        'role_suffix': '',
+        'task_note': '',
+        'instructions': (
+            "1. **Extract** the most critical facts and numbers only\n"
+            "2. **Format** exactly as specified below"
+        ),
+    },
+}
+
+# Separator line around each message in a marshaled text batch, in the
+# prompt and in Gemini's response
+_BATCH_ITEM_RE = re.compile(r'^=== ITEM (\d+) ===[ \t]*$', re.MULTILINE)
+
+# Uploaded documents reused by content hash. Gemini deletes uploads after
+# 48 hours, so handles are dropped a little before that
+UPLOAD_CACHE_SIZE = 128
+UPLOAD_CACHE_TTL = 47 * 3600  # seconds
+
+
+@dataclass(slots=True)
+class LLMContext:
+    """
+    Per-message context passed to the LLM prompt builders.
+
+    Built once per message by the pipeline; slotted, since one is created
+    for every message processed.
+    """
+
+    source_channel: str = 'Unknown Source'
+    channel_id: Any = None  # Telegram chat ID or source ID
+    has_chinese: bool = False
+    message_link: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
 
 class GeminiService:
     """
@@ -32,22 +128,27 @@ class GeminiService:
         # Configure the model
         self.model = genai.GenerativeModel(
             model_name=settings.GEMINI_MODEL,
-            safety_settings={
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-            }
+            safety_settings=_SAFETY_SETTINGS
         )
 
-        logger.info(f"Gemini service initialized with model: {settings.GEMINI_MODEL}")
+        # Model bound to the cached analyst prompt (see _get_analyst_model)
+        self._analyst_model: Optional[genai.GenerativeModel] = None
+        self._analyst_model_expires = 0.0
+        self._analyst_cache_unavailable = False
+
+        # Uploaded File API handles by document hash (see process_document)
+        self._uploads: LRUCache[Any] = LRUCache(maxsize=UPLOAD_CACHE_SIZE, ttl=UPLOAD_CACHE_TTL)
 
-    async def _upload_and_wait_for_file(self, file_path: Path) -> Any:
+        logger.info("Gemini service initialized with model: %s", settings.GEMINI_MODEL)
+
+    async def _upload_and_wait_for_file(self, file_path: Union[Path, IO[bytes]],
+                                        mime_type: Optional[str] = None) -> Any:
         """
         Upload a file to Gemini File API and wait for processing.
 
         Args:
-            file_path: Path to the file to upload
+            file_path: Path to the file to upload, or an in-memory file object
+            mime_type: MIME type (required for file objects, inferred for paths)
 
         Returns:
             Uploaded file object ready for use
@@ -57,18 +158,22 @@ class GeminiService:
             TimeoutError: If file processing times out
             ValueError: If file processing fails
         """
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
+        if isinstance(file_path, Path):
+            if not file_path.exists():
+                raise FileNotFoundError(f"File not found: {file_path}")
+            name = file_path.name
+            upload = lambda: genai.upload_file(str(file_path), mime_type=mime_type)
+        else:
+            name = getattr(file_path, 'name', 'in-memory file')
+            file_path.seek(0)
+            upload = lambda: genai.upload_file(file_path, mime_type=mime_type, display_name=name)
 
-        logger.info(f"Uploading file to Gemini File API: {file_path.name}")
+        logger.info("Uploading file to Gemini File API: %s", name)
 
         loop = asyncio.get_event_loop()
-        uploaded_file = await loop.run_in_executor(
-            None,
-            lambda: genai.upload_file(str(file_path))
-        )
+        uploaded_file = await loop.run_in_executor(None, upload)
 
-        logger.info(f"File uploaded: {uploaded_file.name} ({uploaded_file.state.name})")
+        logger.info("File uploaded: %s (%s)", uploaded_file.name, uploaded_file.state.name)
 
         # Wait for file processing if needed
         if uploaded_file.state.name == "PROCESSING":
@@ -91,6 +196,74 @@ class GeminiService:
 
         return uploaded_file
 
+    async def _get_analyst_model(self) -> Optional[genai.GenerativeModel]:
+        """
+        Get a model whose context is the analyst prompt stored as Gemini cached content.
+
+        The prompt is identical for every report, so caching it means only the
+        PDF is sent (and billed) per request. The cache is created on first use
+        and recreated shortly before its TTL runs out. If the API refuses to
+        cache it (e.g. the prompt is below the model's minimum cacheable size)
+        this returns None for the rest of the process and callers send the
+        prompt inline instead.
+
+        Returns:
+            GenerativeModel bound to the cached prompt, or None
+        """
+        if self._analyst_cache_unavailable:
+            return None
+
+        if self._analyst_model is not None and time.monotonic() < self._analyst_model_expires:
+            return self._analyst_model
+
+        prompt = self._build_equity_analysis_prompt()
+
+        def create():
+            cached = genai.caching.CachedContent.create(
+                model=settings.GEMINI_MODEL,
+                display_name='yaronotifs-analyst-prompt',
+                system_instruction=prompt,
+                ttl=timedelta(seconds=ANALYST_CACHE_TTL)
+            )
+            return genai.GenerativeModel.from_cached_content(
+                cached,
+                safety_settings=_SAFETY_SETTINGS
+            )
+
+        try:
+            loop = asyncio.get_event_loop()
+            self._analyst_model = await loop.run_in_executor(None, create)
+            self._analyst_model_expires = (
+                time.monotonic() + ANALYST_CACHE_TTL - ANALYST_CACHE_REFRESH_MARGIN
+            )
+            logger.info("Cached analyst prompt in Gemini context cache")
+            return self._analyst_model
+
+        except Exception as e:
+            logger.warning("Gemini context caching unavailable, sending prompt inline: %s", e)
+            self._analyst_model = None
+            self._analyst_cache_unavailable = True
+            return None
+
+    @retry_async(max_attempts=3, delay=2.0, backoff=2.0)
+    async def analyze_pdf_bytes(self, pdf_file: IO[bytes], mime_type: str = 'application/pdf') -> str:
+        """
+        Analyze an in-memory PDF, uploading it to Gemini without touching disk.
+
+        Same analysis as analyze_pdf_file().
+
+        Args:
+            pdf_file: File object (e.g. BytesIO) holding the PDF
+            mime_type: MIME type of the document
+
+        Returns:
+            str: Markdown-formatted summary with key insights
+
+        Raises:
+            Exception: If API call fails after retries
+        """
+        return await self._analyze_pdf(pdf_file, mime_type)
+
     @retry_async(max_attempts=3, delay=2.0, backoff=2.0)
     async def analyze_pdf_file(self, pdf_path: Path) -> str:
         """
@@ -112,36 +285,60 @@ class GeminiService:
         Raises:
             Exception: If API call fails after retries
         """
+        return await self._analyze_pdf(pdf_path)
+
+    async def _analyze_pdf(self, pdf: Union[Path, IO[bytes]], mime_type: Optional[str] = None) -> str:
+        """
+        Upload a PDF and run the equity analysis prompt over it.
+
+        Args:
+            pdf: Path or file object holding the PDF
+            mime_type: MIME type (required for file objects)
+
+        Returns:
+            str: Markdown-formatted summary
+        """
         try:
             # Upload and wait for file processing
-            uploaded_file = await self._upload_and_wait_for_file(pdf_path)
+            uploaded_file = await self._upload_and_wait_for_file(pdf, mime_type)
 
-            # Generate analysis using the uploaded file
-            prompt = self._build_equity_analysis_prompt()
+            # Generate analysis using the uploaded file; the prompt comes from
+            # the context cache when available, otherwise it's sent inline
+            analyst_model = await self._get_analyst_model()
+            if analyst_model is not None:
+                model, contents = analyst_model, [uploaded_file]
+            else:
+                model, contents = self.model, [uploaded_file, self._build_equity_analysis_prompt()]
 
             loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.model.generate_content([uploaded_file, prompt])
-            )
+            try:
+                response = await loop.run_in_executor(
+                    None,
+                    lambda: model.generate_content(contents)
+                )
+            except Exception:
+                # The cache may have expired or been evicted; recreate it on retry
+                if analyst_model is not None:
+                    self._analyst_model = None
+                raise
 
             if not response or not response.text:
                 raise ValueError("Empty response from Gemini API")
 
             summary = response.text.strip()
-            logger.info(f"Generated summary: {len(summary)} characters")
+            logger.info("Generated summary: %d characters", len(summary))
 
             # Delete the uploaded file to save quota
             await loop.run_in_executor(
                 None,
                 lambda: genai.delete_file(uploaded_file.name)
             )
-            logger.debug(f"Deleted uploaded file: {uploaded_file.name}")
+            logger.debug("Deleted uploaded file: %s", uploaded_file.name)
 
             return summary
 
         except Exception as e:
-            logger.error(f"Gemini File API error: {e}")
+            logger.error("Gemini File API error: %s", e)
             raise
 
     def _build_equity_analysis_prompt(self) -> str:
@@ -186,7 +383,7 @@ class GeminiService:
 """
 
     @retry_async(max_attempts=3, delay=2.0, backoff=2.0)
-    async def process_text_message(self, text: str, context: dict) -> str:
+    async def process_text_message(self, text: str, context: LLMContext) -> str:
         """
         Process a text message using LLM to intelligently handle:
         - Language detection and translation
@@ -207,26 +404,32 @@ class GeminiService:
         try:
             prompt = self._build_text_processing_prompt(text, context)
 
+            # Deadline enforced by the transport, so a stuck request ends
+            # (and is retried) instead of pinning an executor thread
             loop = asyncio.get_event_loop()
             response = await loop.run_in_executor(
                 None,
-                lambda: self.model.generate_content(prompt)
+                lambda: self.model.generate_content(
+                    prompt,
+                    request_options={'timeout': settings.GEMINI_REQUEST_TIMEOUT}
+                )
             )
 
             if not response or not response.text:
                 raise ValueError("Empty response from Gemini API")
 
             result = response.text.strip()
-            logger.info(f"Processed text message: {len(result)} characters")
+            logger.info("Processed text message: %d characters", len(result))
 
             return result
 
         except Exception as e:
-            logger.error(f"Gemini text processing error: {e}")
+            logger.error("Gemini text processing error: %s", e)
             raise
 
     @retry_async(max_attempts=3, delay=2.0, backoff=2.0)
-    async def process_document(self, file_path: Path, context: dict) -> str:
+    async def process_document(self, file_path: Union[Path, IO[bytes]], context: LLMContext,
+                               mime_type: Optional[str] = None, digest: Optional[str] = None) -> str:
         """
         Process a document (PDF, image, etc.) using LLM's multimodal capabilities.
 
@@ -236,9 +439,15 @@ class GeminiService:
         - Key insights extraction
         - Contextual understanding
 
+        When a content digest is given, the upload is kept and reused for the
+        same document (e.g. a report forwarded to several channels, processed
+        with each channel's context) instead of being uploaded again.
+
         Args:
-            file_path: Path to the document file
+            file_path: Path to the document file, or an in-memory file object
             context: Context information about the message
+            mime_type: MIME type (required for file objects, inferred for paths)
+            digest: Optional content hash of the document, enabling upload reuse
 
         Returns:
             str: Processed and formatted content
@@ -247,99 +456,127 @@ class GeminiService:
             Exception: If API call fails after retries
         """
         try:
-            # Upload and wait for file processing
-            uploaded_file = await self._upload_and_wait_for_file(file_path)
+            uploaded_file = self._uploads.get(digest) if digest else None
+            if uploaded_file is not None:
+                logger.info("Reusing uploaded file: %s", uploaded_file.name)
+            else:
+                # Upload and wait for file processing
+                uploaded_file = await self._upload_and_wait_for_file(file_path, mime_type)
+                if digest:
+                    self._uploads.set(digest, uploaded_file)
 
             # Generate analysis using the uploaded file
             prompt = self._build_document_processing_prompt(context)
 
             loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.model.generate_content([uploaded_file, prompt])
-            )
+            try:
+                response = await loop.run_in_executor(
+                    None,
+                    lambda: self.model.generate_content(
+                        [uploaded_file, prompt],
+                        request_options={'timeout': settings.GEMINI_DOCUMENT_TIMEOUT}
+                    )
+                )
+            except Exception:
+                # The upload may have expired; upload again on retry
+                if digest:
+                    self._uploads.pop(digest)
+                raise
 
             if not response or not response.text:
                 raise ValueError("Empty response from Gemini API")
 
             result = response.text.strip()
-            logger.info(f"Processed document: {len(result)} characters")
+            logger.info("Processed document: %d characters", len(result))
 
-            # Delete the uploaded file to save quota
-            await loop.run_in_executor(
-                None,
-                lambda: genai.delete_file(uploaded_file.name)
-            )
-            logger.debug(f"Deleted uploaded file: {uploaded_file.name}")
+            # Delete one-off uploads to save quota; cached ones expire on Gemini's side
+            if not digest:
+                await loop.run_in_executor(
+                    None,
+                    lambda: genai.delete_file(uploaded_file.name)
+                )
+                logger.debug("Deleted uploaded file: %s", uploaded_file.name)
 
             return result
 
         except Exception as e:
-            logger.error(f"Gemini document processing error: {e}")
+            logger.error("Gemini document processing error: %s", e)
             raise
 
-    def _build_text_processing_prompt(self, text: str, context: dict) -> str:
+    async def process_text_batch(self, items: List[Tuple[str, LLMContext]],
+                                 timeout: Optional[float] = None) -> List[str]:
         """
-        Build a prompt for intelligent text processing.
+        Process several short text messages in a single Gemini request.
+
+        Each message is formatted exactly as process_text_message would, but
+        the batch pays one network round-trip and counts as one request
+        against rate limits. Messages are delimited by `=== ITEM N ===`
+        lines, and the model echoes the same separators in its response.
+        Plain separators hold up better than asking for JSON, which the
+        model has to escape every quote and newline of Markdown output for.
+
+        Not retried: callers fall back to process_text_message per item.
 
         Args:
-            text: The text to process
-            context: Context information
+            items: (text, context) pairs
+            timeout: Request deadline in seconds (defaults to GEMINI_REQUEST_TIMEOUT)
 
         Returns:
-            str: Formatted prompt for Gemini
-        """
-        has_chinese = context.get("has_chinese", False)
-        source_channel = context.get("source_channel", "Unknown Source")
-
-        if has_chinese:
-            return f"""# Role: Market Intelligence Analyst & Translator
+            list: Processed content for each item, in order
 
-**Source:** {source_channel}
+        Raises:
+            ValueError: If the response doesn't have one non-empty section
+                per item, numbered in order
+        """
+        prompt = self._build_text_batch_prompt(items)
 
-**Task:** Process the following message for a professional investor. The message contains Chinese text.
+        loop = asyncio.get_event_loop()
+        response = await loop.run_in_executor(
+            None,
+            lambda: self.model.generate_content(
+                prompt,
+                request_options={'timeout': timeout or settings.GEMINI_REQUEST_TIMEOUT}
+            )
+        )
 
-**Instructions:**
-1. **Translate** the Chinese text to English (if present)
-2. **Extract** the most critical facts and numbers only
-3. **Format** exactly as specified below
+        if not response or not response.text:
+            raise ValueError("Empty response from Gemini API")
 
-**Output Format:**
-**Headline:** [One bold sentence summarizing the key news]
+        # split() with one capture group alternates: preamble, number, body, number, body...
+        parts = _BATCH_ITEM_RE.split(response.text)
+        numbers = [int(number) for number in parts[1::2]]
+        results = [body.strip() for body in parts[2::2]]
+        if numbers != list(range(1, len(items) + 1)) or not all(results):
+            raise ValueError(f"Expected {len(items)} ITEM sections from Gemini, got {numbers}")
 
-• [Key point 1 with specific data/numbers]
-• [Key point 2 with specific data/numbers]
-• [Key point 3 - only if essential]
+        logger.info("Processed %d text messages in one request", len(items))
+        return results
 
-**Rules:**
-- Start with a bold headline sentence (max 15 words)
-- Use bullet points (•) for key facts
-- Include specific numbers, amounts, dates, valuations
-- NO fluff or background context - facts only
-- Maximum 3 bullet points
-- Be direct and factual
-
-**Tone:** Telegraph-style brevity - no fluff
-**Length:** 100-150 words maximum
-
----
+    def _build_text_batch_prompt(self, items: List[Tuple[str, LLMContext]]) -> str:
+        """
+        Build a prompt that processes several messages independently.
 
-**Message to process:**
+        Args:
+            items: (text, context) pairs
 
-{text}
-"""
-        else:
-            return f"""# Role: Market Intelligence Analyst
+        Returns:
+            str: Formatted prompt for Gemini
+        """
+        messages = "\n\n".join(
+            f"=== ITEM {i} ===\nSource: {context.source_channel}\n\n{text}"
+            for i, (text, context) in enumerate(items, 1)
+        )
 
-**Source:** {source_channel}
+        return f"""# Role: Market Intelligence Analyst & Translator
 
-**Task:** Process the following message for a professional investor.
+**Task:** Process each of the {len(items)} messages below independently for a professional investor.
 
-**Instructions:**
-1. **Extract** the most critical facts and numbers only
-2. **Format** exactly as specified below
+**Instructions (apply to each message separately):**
+1. **Translate** any Chinese text to English
+2. **Extract** the most critical facts and numbers only
+3. **Format** exactly as specified below
 
-**Output Format:**
+**Output Format (per message):**
 **Headline:** [One bold sentence summarizing the key news]
 
 • [Key point 1 with specific data/numbers]
@@ -353,18 +590,36 @@ class GeminiService:
 - NO fluff or background context - facts only
 - Maximum 3 bullet points
 - Be direct and factual
+- Never mix facts between messages
 
 **Tone:** Telegraph-style brevity - no fluff
-**Length:** 100-150 words maximum
+**Length:** 100-150 words maximum per message
 
----
+**Response:** For each of the {len(items)} messages, in the order given, output a line `=== ITEM N ===` (N = the message's item number) followed by that message's formatted output. Output nothing before the first separator.
 
-**Message to process:**
+---
 
-{text}
+{messages}
 """
 
-    def _build_document_processing_prompt(self, context: dict) -> str:
+    def _build_text_processing_prompt(self, text: str, context: LLMContext) -> str:
+        """
+        Build a prompt for intelligent text processing.
+
+        Args:
+            text: The text to process
+            context: Context information
+
+        Returns:
+            str: Formatted prompt for Gemini
+        """
+        return _TEXT_PROMPT_TEMPLATE.format(
+            source_channel=context.source_channel,
+            text=text,
+            **_TEXT_PROMPT_VARIANTS[bool(context.has_chinese)]
+        )
+
+    def _build_document_processing_prompt(self, context: LLMContext) -> str:
         """
         Build a prompt for intelligent document processing.
 
@@ -377,7 +632,7 @@ class GeminiService:
         Returns:
             str: Formatted prompt for Gemini
         """
-        source_channel = context.get("source_channel", "Unknown Source")
+        source_channel = context.source_channel
 
         return f"""# Role: Senior Market Intelligence Analyst (Buy-Side)
 
@@ -451,5 +706,19 @@ class GeminiService:
             )
             return bool(response and response.text)
         except Exception as e:
-            logger.error(f"Gemini health check failed: {e}")
+            logger.error("Gemini health check failed: %s", e)
             return False
+
+
+@lru_cache(maxsize=1)
+def get_gemini_service() -> GeminiService:
+    """
+    Get the process-wide GeminiService.
+
+    Pipelines and services share one instance, so the API client, model
+    handles and the cached analyst prompt are set up once.
+
+    Returns:
+        GeminiService: Shared instance configured from settings
+    """
+    return GeminiService()
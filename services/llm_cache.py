@@ -0,0 +1,120 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import settings
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Bump whenever the text/document prompts change, so stale responses are ignored
+PROMPT_VERSION = 1
+
+
+class LLMCache:
+    """
+    Durable, content-addressed cache of LLM responses.
+
+    Responses are stored in SQLite keyed by a hash of the input (message text
+    or document bytes), the model and PROMPT_VERSION, so content forwarded
+    across channels, or seen again after a restart, doesn't cost another
+    Gemini call.
+
+    SQLite calls run in worker threads via asyncio.to_thread; a lock
+    serializes them on the single shared connection.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, model: Optional[str] = None,
+                 max_age_days: int = 7):
+        """
+        Initialize the cache (the database is opened on first use).
+
+        Args:
+            db_path: SQLite file (defaults to settings.LLM_CACHE_PATH)
+            model: Model name stored with each response (defaults to settings.GEMINI_MODEL)
+            max_age_days: Entries older than this are ignored and pruned
+        """
+        self.db_path = db_path or settings.LLM_CACHE_PATH
+        self.model = model or settings.GEMINI_MODEL
+        self.max_age = max_age_days * 86400
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " hash TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " prompt_version INTEGER NOT NULL,"
+                " response TEXT NOT NULL,"
+                " created_at INTEGER NOT NULL)"
+            )
+            conn.execute("DELETE FROM cache WHERE created_at < ?", (int(time.time()) - self.max_age,))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT response FROM cache"
+                " WHERE hash = ? AND model = ? AND prompt_version = ? AND created_at >= ?",
+                (key, self.model, PROMPT_VERSION, int(time.time()) - self.max_age)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_sync(self, key: str, response: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (hash, model, prompt_version, response, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, self.model, PROMPT_VERSION, response, int(time.time()))
+            )
+            conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Errors are logged and treated as a miss; the cache is an optimization.
+
+        Args:
+            key: Content hash (callers prefix it by kind, e.g. "text:" or "pdf:")
+
+        Returns:
+            str: The cached response, or None
+        """
+        try:
+            return await asyncio.to_thread(self._get_sync, key)
+        except Exception as e:
+            logger.warning("LLM cache lookup failed: %s", e)
+            return None
+
+    async def set(self, key: str, response: str) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Content hash
+            response: LLM response to cache
+        """
+        try:
+            await asyncio.to_thread(self._set_sync, key, response)
+        except Exception as e:
+            logger.warning("LLM cache write failed: %s", e)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -4,13 +4,28 @@ from typing import Optional
 import aiohttp
 
 from PyPDF2 import PdfReader
-from pypdf import PdfReader as PyPdfReader
+from pypdf import PdfReader as PyPdfReader, PdfWriter
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; compaction then skips image downsampling
+    Image = None
 
 from config import settings
 from utils import get_logger, retry_async, safe_filename, format_file_size
 
 logger = get_logger(__name__)
 
+# Bytes requested from Telegram per chunk when streaming a document to disk
+# (512 KiB is the largest chunk Telegram serves)
+DOWNLOAD_CHUNK_SIZE = 512 * 1024
+
+# PDF compaction: smaller files aren't worth rewriting; wider images are
+# downsampled to this width (~150 DPI across a letter/A4 page) and re-encoded as JPEG
+COMPACT_MIN_BYTES = 2 * 1024 * 1024
+COMPACT_MAX_IMAGE_WIDTH = 1500
+COMPACT_JPEG_QUALITY = 75
+
 
 class PDFService:
     """
@@ -81,14 +96,117 @@ class PDFService:
 
                             f.write(chunk)
 
-            logger.info(f"Downloaded PDF: {filename} ({format_file_size(total_size)})")
+            logger.info("Downloaded PDF: %s (%s)", filename, format_file_size(total_size))
             return file_path
 
         except Exception as e:
-            logger.error(f"Failed to download PDF from {url}: {e}")
+            logger.error("Failed to download PDF from %s: %s", url, e)
+            file_path.unlink(missing_ok=True)
+            raise
+
+    async def download_document(self, client, document, file_path: Path, hasher=None) -> Path:
+        """
+        Stream a Telegram document to disk in chunks.
+
+        Each chunk is written from a worker thread, so large reports don't
+        stall the event loop on file syscalls while other channels' messages
+        are waiting.
+
+        Args:
+            client: Telegram client to download with
+            document: Telegram document (e.g. message.document)
+            file_path: Destination path
+            hasher: Optional hashlib object updated with each chunk, so the
+                digest is ready without re-reading the file
+
+        Returns:
+            Path: Path to the downloaded file
+
+        Raises:
+            Exception: If download fails (the partial file is removed)
+        """
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            with open(file_path, 'wb') as f:
+                async for chunk in client.iter_download(document, chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    await asyncio.to_thread(f.write, chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+            return file_path
+
+        except BaseException:
             file_path.unlink(missing_ok=True)
             raise
 
+    async def compact(self, pdf_path: Path) -> Path:
+        """
+        Write a smaller copy of a PDF for sending to Gemini.
+
+        Oversized embedded images (typically full-page scans) are downsampled
+        and re-encoded as JPEG, content streams are compressed and duplicate
+        objects merged. Runs in a worker thread.
+
+        Args:
+            pdf_path: Path to the original PDF
+
+        Returns:
+            Path: The compacted copy (caller deletes it), or pdf_path itself if
+                the file is small, compaction fails, or it doesn't save space
+        """
+        try:
+            if pdf_path.stat().st_size < COMPACT_MIN_BYTES:
+                return pdf_path
+
+            out_path = pdf_path.with_name(f"{pdf_path.stem}.compact.pdf")
+            return await asyncio.to_thread(self._compact_sync, pdf_path, out_path)
+
+        except Exception as e:
+            logger.warning("PDF compaction failed, using original: %s", e)
+            return pdf_path
+
+    def _compact_sync(self, pdf_path: Path, out_path: Path) -> Path:
+        """
+        Synchronous PDF compaction (runs in a worker thread).
+
+        Args:
+            pdf_path: Path to the original PDF
+            out_path: Where to write the compacted copy
+
+        Returns:
+            Path: out_path if it's smaller than the original, else pdf_path
+        """
+        writer = PdfWriter(clone_from=pdf_path)
+
+        for page in writer.pages:
+            if Image is not None:
+                for image_file in page.images:
+                    image = image_file.image
+                    # Bilevel scans are already compact; JPEG would grow them
+                    if image.width <= COMPACT_MAX_IMAGE_WIDTH or image.mode == '1':
+                        continue
+                    height = max(1, image.height * COMPACT_MAX_IMAGE_WIDTH // image.width)
+                    resized = image.resize((COMPACT_MAX_IMAGE_WIDTH, height))
+                    if resized.mode not in ('RGB', 'L'):
+                        resized = resized.convert('RGB')
+                    image_file.replace(resized, quality=COMPACT_JPEG_QUALITY)
+            page.compress_content_streams()
+
+        writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+        writer.write(out_path)
+
+        original_size = pdf_path.stat().st_size
+        compact_size = out_path.stat().st_size
+        if compact_size >= original_size:
+            out_path.unlink(missing_ok=True)
+            return pdf_path
+
+        logger.info(
+            "Compacted %s: %s -> %s",
+            pdf_path.name, format_file_size(original_size), format_file_size(compact_size)
+        )
+        return out_path
+
     async def extract_text(self, pdf_path: Path) -> str:
         """
         Extract text content from a PDF file.
@@ -115,13 +233,13 @@ class PDFService:
             text = await loop.run_in_executor(None, self._extract_text_sync, pdf_path)
 
             if not text or len(text.strip()) < 100:
-                logger.warning(f"Extracted text is too short or empty: {len(text)} chars")
+                logger.warning("Extracted text is too short or empty: %d chars", len(text))
 
-            logger.info(f"Extracted {len(text)} characters from {pdf_path.name}")
+            logger.info("Extracted %d characters from %s", len(text), pdf_path.name)
             return text
 
         except Exception as e:
-            logger.error(f"Failed to extract text from {pdf_path}: {e}")
+            logger.error("Failed to extract text from %s: %s", pdf_path, e)
             raise
 
     def _extract_text_sync(self, pdf_path: Path) -> str:
@@ -145,7 +263,7 @@ class PDFService:
                 for page in reader.pages:
                     text_parts.append(page.extract_text() or '')
         except Exception as e:
-            logger.warning(f"PyPDF2 extraction failed, trying pypdf: {e}")
+            logger.warning("PyPDF2 extraction failed, trying pypdf: %s", e)
 
             # Fallback to pypdf
             try:
@@ -154,24 +272,23 @@ class PDFService:
                     for page in reader.pages:
                         text_parts.append(page.extract_text() or '')
             except Exception as e2:
-                logger.error(f"All PDF extraction methods failed: {e2}")
+                logger.error("All PDF extraction methods failed: %s", e2)
                 raise
 
         return '\n\n'.join(text_parts).strip()
 
     async def cleanup_file(self, file_path: Path) -> None:
         """
-        Delete a temporary PDF file.
+        Delete a temporary PDF file (in a worker thread, off the event loop).
 
         Args:
             file_path: Path to file to delete
         """
         try:
-            if file_path.exists():
-                file_path.unlink()
-                logger.debug(f"Cleaned up temporary file: {file_path.name}")
+            await asyncio.to_thread(file_path.unlink, missing_ok=True)
+            logger.debug("Cleaned up temporary file: %s", file_path.name)
         except Exception as e:
-            logger.warning(f"Failed to cleanup {file_path}: {e}")
+            logger.warning("Failed to cleanup %s: %s", file_path, e)
 
     async def cleanup_old_files(self, max_age_hours: int = 24) -> int:
         """
@@ -195,9 +312,9 @@ class PDFService:
                     deleted_count += 1
 
             if deleted_count > 0:
-                logger.info(f"Cleaned up {deleted_count} old PDF files")
+                logger.info("Cleaned up %d old PDF files", deleted_count)
 
         except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
+            logger.error("Error during cleanup: %s", e)
 
         return deleted_count
@@ -24,6 +24,7 @@ See ADDING_NEW_SOURCES.md for step-by-step guides.
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Optional, Dict, Any, AsyncIterator
 from pathlib import Path
 from datetime import datetime
@@ -92,12 +93,17 @@ class SourceMessage:
         """Check if this message contains text."""
         return self.text is not None and len(self.text.strip()) > 0
 
-    def get_source_link(self) -> str:
-        """Get a formatted source attribution link."""
+    @cached_property
+    def source_link(self) -> str:
+        """Formatted source attribution link (built once per message)."""
         if self.url:
             return f"[{self.source_name}]({self.url})"
         return self.source_name
 
+    def get_source_link(self) -> str:
+        """Get a formatted source attribution link."""
+        return self.source_link
+
 
 class BaseSource(ABC):
     """
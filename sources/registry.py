@@ -60,7 +60,7 @@ class SourceRegistry:
             raise ValueError(f"Source with ID '{source.source_id}' already registered")
 
         self.sources[source.source_id] = source
-        logger.info(f"Registered source: {source.name} (ID: {source.source_id})")
+        logger.info("Registered source: %s (ID: %s)", source.name, source.source_id)
 
     def unregister(self, source_id: str) -> None:
         """
@@ -71,7 +71,7 @@ class SourceRegistry:
         """
         if source_id in self.sources:
             del self.sources[source_id]
-            logger.info(f"Unregistered source: {source_id}")
+            logger.info("Unregistered source: %s", source_id)
 
     def get_source(self, source_id: str) -> BaseSource:
         """
@@ -108,7 +108,7 @@ class SourceRegistry:
             logger.warning("No sources registered")
             return False
 
-        logger.info(f"Starting {len(self.sources)} sources...")
+        logger.info("Starting %d sources...", len(self.sources))
 
         results = await asyncio.gather(
             *[source.start() for source in self.sources.values()],
@@ -119,9 +119,9 @@ class SourceRegistry:
         failure_count = len(results) - success_count
 
         if failure_count > 0:
-            logger.warning(f"Started {success_count}/{len(self.sources)} sources")
+            logger.warning("Started %d/%d sources", success_count, len(self.sources))
         else:
-            logger.info(f"✓ All {success_count} sources started successfully")
+            logger.info("✓ All %d sources started successfully", success_count)
 
         self.running = True
         return success_count > 0
@@ -131,7 +131,7 @@ class SourceRegistry:
         Stop all registered sources.
         """
         self.running = False
-        logger.info(f"Stopping {len(self.sources)} sources...")
+        logger.info("Stopping %d sources...", len(self.sources))
 
         await asyncio.gather(
             *[source.stop() for source in self.sources.values()],
@@ -157,7 +157,7 @@ class SourceRegistry:
             logger.error("No sources registered")
             return
 
-        logger.info(f"Processing messages from {len(self.sources)} sources...")
+        logger.info("Processing messages from %d sources...", len(self.sources))
 
         # Create tasks for each source's message stream
         tasks = []
@@ -187,9 +187,13 @@ class SourceRegistry:
                 # Process each message in a separate task to avoid blocking
                 asyncio.create_task(self._handle_message(message, handler))
 
+                # Yield so the new task (and everything else) gets to run even
+                # if the source has a backlog ready without awaiting I/O
+                await asyncio.sleep(0)
+
         except Exception as e:
             logger.error(
-                f"Error processing messages from {source.name}: {e}",
+                "Error processing messages from %s: %s", source.name, e,
                 exc_info=True
             )
 
@@ -209,7 +213,7 @@ class SourceRegistry:
             await handler(message)
         except Exception as e:
             logger.error(
-                f"Error handling message from {message.source_name}: {e}",
+                "Error handling message from %s: %s", message.source_name, e,
                 exc_info=True
             )
 
@@ -225,7 +229,7 @@ class SourceRegistry:
             try:
                 health[source_id] = await source.health_check()
             except Exception as e:
-                logger.error(f"Health check failed for {source_id}: {e}")
+                logger.error("Health check failed for %s: %s", source_id, e)
                 health[source_id] = False
 
         return health
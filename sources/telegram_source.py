@@ -4,9 +4,10 @@ Telegram source provider.
 Wraps the existing Telegram client to conform to the BaseSource interface.
 """
 
-from typing import AsyncIterator, List
+from typing import AsyncIterator, List, Optional
 from telethon.tl.types import Message
 import asyncio
+import hashlib
 
 from .base import BaseSource, SourceMessage
 from core import TelegramClientWrapper
@@ -27,7 +28,8 @@ class TelegramSource(BaseSource):
         self,
         name: str = "Telegram",
         source_id: str = "telegram",
-        monitored_channels: List[int] = None
+        monitored_channels: List[int] = None,
+        session_exists: Optional[bool] = None
     ):
         """
         Initialize Telegram source.
@@ -36,9 +38,12 @@ class TelegramSource(BaseSource):
             name: Human-readable name
             source_id: Unique identifier
             monitored_channels: List of channel IDs to monitor
+            session_exists: Passed to TelegramClientWrapper if the caller has
+                already checked for the session file
         """
         super().__init__(name, source_id)
         self.monitored_channels = monitored_channels or []
+        self.session_exists = session_exists
         self.client: TelegramClientWrapper = None
         self.message_queue: asyncio.Queue = asyncio.Queue()
 
@@ -50,14 +55,15 @@ class TelegramSource(BaseSource):
             bool: True if started successfully
         """
         try:
-            self.client = TelegramClientWrapper()
+            self.client = TelegramClientWrapper(session_exists=self.session_exists)
 
             if not await self.client.start():
                 logger.error("Failed to start Telegram client")
                 return False
 
-            # Refresh dialog cache
-            await self.client.client.get_dialogs()
+            # Resolve only the monitored channels (served from the session's
+            # entity cache); fall back to a full dialog sync if any is unknown
+            await self._resolve_monitored_channels()
 
             # Register message handler
             self.client.on_new_message(
@@ -66,13 +72,35 @@ class TelegramSource(BaseSource):
             )
 
             self.running = True
-            logger.info(f"✓ TelegramSource started, monitoring {len(self.monitored_channels)} channels")
+            logger.info("✓ TelegramSource started, monitoring %d channels", len(self.monitored_channels))
             return True
 
         except Exception as e:
-            logger.error(f"Failed to start TelegramSource: {e}", exc_info=True)
+            logger.error("Failed to start TelegramSource: %s", e, exc_info=True)
             return False
 
+    async def _resolve_monitored_channels(self) -> None:
+        """
+        Populate the entity cache for the monitored channels.
+
+        Each channel is resolved concurrently with get_input_entity. Channels
+        that are not in the session cache can't be resolved from a bare ID, so
+        if any lookup fails the full dialog list is fetched instead.
+        """
+        client = self.client.client
+        results = await asyncio.gather(
+            *(client.get_input_entity(chat_id) for chat_id in self.monitored_channels),
+            return_exceptions=True
+        )
+
+        failed = [
+            chat_id for chat_id, result in zip(self.monitored_channels, results)
+            if isinstance(result, Exception)
+        ]
+        if failed:
+            logger.info("%d channel(s) not in entity cache, refreshing dialogs", len(failed))
+            await client.get_dialogs()
+
     async def stop(self) -> None:
         """
         Stop the Telegram client and cleanup.
@@ -92,20 +120,20 @@ class TelegramSource(BaseSource):
         start_time = time.time()
 
         try:
-            logger.info(f"⏱️ [TIMING] Event triggered for message {message.id} from chat {message.chat_id}")
+            logger.info("⏱️ [TIMING] Event triggered for message %s from chat %s", message.id, message.chat_id)
 
             convert_start = time.time()
             source_message = await self._convert_telegram_message(message)
             convert_time = time.time() - convert_start
 
-            logger.info(f"⏱️ [TIMING] Message conversion took {convert_time:.2f}s")
+            logger.info("⏱️ [TIMING] Message conversion took %.2fs", convert_time)
 
             await self.message_queue.put(source_message)
 
             total_time = time.time() - start_time
-            logger.info(f"⏱️ [TIMING] Total event handling took {total_time:.2f}s")
+            logger.info("⏱️ [TIMING] Total event handling took %.2fs", total_time)
         except Exception as e:
-            logger.error(f"Error converting Telegram message: {e}", exc_info=True)
+            logger.error("Error converting Telegram message: %s", e, exc_info=True)
 
     async def _convert_telegram_message(self, message: Message) -> SourceMessage:
         """
@@ -119,7 +147,7 @@ class TelegramSource(BaseSource):
         """
         from pathlib import Path
         from services import PDFService
-        from utils import safe_filename
+        from utils import is_pdf_document, safe_filename
 
         # Get source info
         source_name = "Telegram"
@@ -132,7 +160,10 @@ class TelegramSource(BaseSource):
         # Get message link
         url = None
         if hasattr(message, 'chat_id') and hasattr(message, 'id'):
-            chat_id = str(message.chat_id).replace('-100', '')
+            chat_id = message.chat_id
+            if chat_id < -1000000000000:
+                # Strip the -100 channel prefix arithmetically: -100XXXXXXXXXX -> XXXXXXXXXX
+                chat_id = -chat_id - 1000000000000
             url = f"https://t.me/c/{chat_id}/{message.id}"
 
         # Extract text
@@ -141,22 +172,26 @@ class TelegramSource(BaseSource):
         # Handle documents - download if it's a PDF
         document_path = None
         document_mime_type = None
+        document_sha256 = None
         if message.document:
             document_mime_type = message.document.mime_type
             filename = message.file.name if message.file else 'document.pdf'
 
             # Download PDF documents immediately for processing
-            if document_mime_type == 'application/pdf' or filename.endswith('.pdf'):
+            if is_pdf_document(document_mime_type, filename):
                 try:
                     pdf_service = PDFService()
                     safe_name = safe_filename(filename)
                     file_path = pdf_service.temp_dir / safe_name
 
-                    await self.client.client.download_media(message.document, file=str(file_path))
+                    # Hash while streaming, so the pipeline's caches don't re-read the file
+                    hasher = hashlib.sha256()
+                    await pdf_service.download_document(self.client.client, message.document, file_path, hasher)
                     document_path = file_path
-                    logger.info(f"Downloaded PDF: {safe_name}")
+                    document_sha256 = hasher.hexdigest()
+                    logger.info("Downloaded PDF: %s", safe_name)
                 except Exception as e:
-                    logger.error(f"Failed to download PDF: {e}")
+                    logger.error("Failed to download PDF: %s", e)
                     # Continue without document - text might still be processable
 
         return SourceMessage(
@@ -170,6 +205,7 @@ class TelegramSource(BaseSource):
             message_id=str(message.id),
             metadata={
                 'chat_id': message.chat_id,
+                'document_sha256': document_sha256,
                 'telegram_message': message  # Keep original for reference
             }
         )
@@ -192,5 +228,5 @@ class TelegramSource(BaseSource):
             except asyncio.TimeoutError:
                 continue
             except Exception as e:
-                logger.error(f"Error getting Telegram message: {e}")
+                logger.error("Error getting Telegram message: %s", e)
                 await asyncio.sleep(1)
@@ -1,4 +1,6 @@
-from .logger import setup_logger, get_logger
-from .helpers import retry_async, detect_chinese, safe_filename, format_file_size, truncate_text
+from .logger import setup_logger, get_logger, shutdown_logging
+from .helpers import PDF_EXTENSIONS, PDF_MIME_TYPES, retry_async, detect_chinese, is_pdf_document, safe_filename, sha256_file, format_file_size, truncate_text
+from .cache import LRUCache
+from .rate_limit import AsyncTokenBucket
 
-__all__ = ['setup_logger', 'get_logger', 'retry_async', 'detect_chinese', 'safe_filename', 'format_file_size', 'truncate_text']
+__all__ = ['setup_logger', 'get_logger', 'shutdown_logging', 'PDF_EXTENSIONS', 'PDF_MIME_TYPES', 'retry_async', 'detect_chinese', 'is_pdf_document', 'safe_filename', 'sha256_file', 'format_file_size', 'truncate_text', 'LRUCache', 'AsyncTokenBucket']
@@ -1,6 +1,8 @@
 import asyncio
+import hashlib
+import random
 import re
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import Callable, Any, TypeVar, Optional
 from pathlib import Path
 
@@ -10,17 +12,62 @@ logger = get_logger(__name__)
 
 T = TypeVar('T')
 
+# Chinese characters (CJK Unified Ideographs, Extension A, Compatibility Ideographs)
+_CJK_RE = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf\uf900-\ufaff]')
+
+# Only the start of a message is scanned; Chinese news shows Chinese right away
+_CJK_SCAN_LIMIT = 512
+
+# Documents treated as PDFs, by MIME type or (lowercased) filename extension
+PDF_MIME_TYPES = frozenset({'application/pdf', 'application/x-pdf'})
+PDF_EXTENSIONS = ('.pdf',)
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """
+    Extract a server-requested wait from an exception, if it carries one.
+
+    Understands Telethon's FloodWaitError (`.seconds`) and HTTP 429 errors
+    whose `.response` has a numeric Retry-After header (requests/aiohttp style).
+
+    Args:
+        exc: The exception raised by the retried call
+
+    Returns:
+        float: Seconds to wait, or None if the exception has no hint
+    """
+    seconds = getattr(exc, 'seconds', None)
+    if isinstance(seconds, (int, float)):
+        return float(seconds)
+
+    response = getattr(exc, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    return None
+
 
 def retry_async(max_attempts: int = 3, delay: float = 1.0, backoff: float = 2.0,
-                exceptions: tuple = (Exception,)):
+                exceptions: tuple = (Exception,), jitter: Optional[str] = None,
+                max_delay: float = 30.0):
     """
     Decorator for retrying async functions with exponential backoff.
 
+    With jitter='full', each wait is drawn uniformly from
+    [0, min(max_delay, delay * backoff**n)], so concurrent callers that fail
+    together don't retry in lockstep. A wait requested by the server
+    (flood wait, 429 Retry-After) is always honored as a lower bound.
+
     Args:
         max_attempts: Maximum number of retry attempts
         delay: Initial delay between retries in seconds
         backoff: Multiplier for delay after each attempt
         exceptions: Tuple of exceptions to catch and retry
+        jitter: None for deterministic backoff, 'full' for full jitter
+        max_delay: Upper bound on the computed backoff in seconds
 
     Example:
         @retry_async(max_attempts=3, delay=2.0)
@@ -30,7 +77,6 @@ def retry_async(max_attempts: int = 3, delay: float = 1.0, backoff: float = 2.0,
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         async def wrapper(*args, **kwargs) -> T:
-            current_delay = delay
             last_exception = None
 
             for attempt in range(1, max_attempts + 1):
@@ -40,16 +86,23 @@ def retry_async(max_attempts: int = 3, delay: float = 1.0, backoff: float = 2.0,
                     last_exception = e
                     if attempt == max_attempts:
                         logger.error(
-                            f"{func.__name__} failed after {max_attempts} attempts: {e}"
+                            "%s failed after %d attempts: %s", func.__name__, max_attempts, e
                         )
                         raise
 
+                    current_delay = min(max_delay, delay * backoff ** (attempt - 1))
+                    if jitter == 'full':
+                        current_delay = random.uniform(0, current_delay)
+
+                    retry_after = _retry_after(e)
+                    if retry_after is not None:
+                        current_delay = max(current_delay, retry_after)
+
                     logger.warning(
-                        f"{func.__name__} attempt {attempt}/{max_attempts} failed: {e}. "
-                        f"Retrying in {current_delay:.1f}s..."
+                        "%s attempt %d/%d failed: %s. Retrying in %.1fs...",
+                        func.__name__, attempt, max_attempts, e, current_delay
                     )
                     await asyncio.sleep(current_delay)
-                    current_delay *= backoff
 
             raise last_exception
 
@@ -61,6 +114,10 @@ def detect_chinese(text: str) -> bool:
     """
     Detect if text contains Chinese characters.
 
+    Only the first 512 characters are scanned, so the cost is bounded on
+    very long messages. Results are memoized on that window, so the same
+    text forwarded by several channels is only scanned once.
+
     Args:
         text: Input text to check
 
@@ -70,9 +127,34 @@ def detect_chinese(text: str) -> bool:
     if not text:
         return False
 
-    # Unicode ranges for Chinese characters (CJK Unified Ideographs)
-    chinese_pattern = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf]+')
-    return bool(chinese_pattern.search(text))
+    window = text[:_CJK_SCAN_LIMIT]
+
+    # Pure-ASCII text can't contain Chinese; isascii() is an O(1) flag check
+    if window.isascii():
+        return False
+
+    return _detect_chinese_window(window)
+
+
+@lru_cache(maxsize=4096)
+def _detect_chinese_window(window: str) -> bool:
+    return _CJK_RE.search(window) is not None
+
+
+def is_pdf_document(mime_type: Optional[str], filename: Optional[str] = None) -> bool:
+    """
+    Check whether a document is a PDF by its MIME type or filename.
+
+    Args:
+        mime_type: Document MIME type (may be None)
+        filename: Optional filename, checked case-insensitively
+
+    Returns:
+        bool: True if either identifies a PDF
+    """
+    if mime_type in PDF_MIME_TYPES:
+        return True
+    return bool(filename) and filename.lower().endswith(PDF_EXTENSIONS)
 
 
 def safe_filename(filename: str, max_length: int = 200) -> str:
@@ -100,6 +182,26 @@ def safe_filename(filename: str, max_length: int = 200) -> str:
     return safe or 'unnamed_file'
 
 
+def sha256_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 hex digest of a file, reading it in chunks.
+
+    This is blocking I/O; call it via asyncio.to_thread from async code.
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def format_file_size(size_bytes: int) -> str:
     """
     Format file size in human-readable format.
@@ -1,13 +1,25 @@
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+
+# Background listeners started by setup_logger (stopped by shutdown_logging)
+_listeners: List[QueueListener] = []
+
 
 def setup_logger(name: str = 'yaronotifs', level: str = 'INFO', log_dir: Optional[Path] = None) -> logging.Logger:
     """
     Configure and return a logger with both console and file handlers.
 
+    The logger itself only gets a QueueHandler; the console/file handlers run
+    on a background QueueListener thread, so writing log output never blocks
+    the event loop. Call shutdown_logging() on exit to flush pending records
+    (it's also registered with atexit).
+
     Args:
         name: Logger name
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -33,7 +45,7 @@ def setup_logger(name: str = 'yaronotifs', level: str = 'INFO', log_dir: Optiona
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
 
     # File handler (if log directory is specified)
     if log_dir:
@@ -44,11 +56,31 @@ def setup_logger(name: str = 'yaronotifs', level: str = 'INFO', log_dir: Optiona
         file_handler = logging.FileHandler(log_file, encoding='utf-8')
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    # Hand records to the real handlers through a queue drained off-thread
+    log_queue: queue.Queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    if not _listeners:
+        atexit.register(shutdown_logging)
+    _listeners.append(listener)
 
     return logger
 
 
+def shutdown_logging() -> None:
+    """
+    Stop the background log listeners, flushing any queued records.
+
+    Safe to call more than once.
+    """
+    while _listeners:
+        _listeners.pop().stop()
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get an existing logger or create a basic one.
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """
+    Asyncio token bucket for pacing outgoing requests.
+
+    Holds up to `capacity` tokens, refilled at `refill_rate` tokens per
+    second. Each acquire() takes one token, sleeping until one is available,
+    so bursts are smoothed to just under the limit instead of being rejected
+    upstream. Waiters are served in arrival order.
+
+    Example:
+        bucket = AsyncTokenBucket(capacity=30, refill_rate=30)  # 30/s
+        await bucket.acquire()
+        await client.send_message(...)
+    """
+
+    def __init__(self, capacity: float, refill_rate: float):
+        """
+        Initialize the bucket (starts full).
+
+        Args:
+            capacity: Maximum tokens (burst size)
+            refill_rate: Tokens added per second
+        """
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.refill_rate)
+        self.last = now
+
+    async def acquire(self) -> None:
+        """
+        Take one token, waiting for the bucket to refill if it's empty.
+        """
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.refill_rate)
+                self._refill()
+            self.tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        """
+        Drain the bucket so no token is available for `seconds`.
+
+        Used when the server asks us to back off (e.g. a Telegram flood wait),
+        so every sender sharing the bucket holds off, not just the one that
+        was rejected.
+
+        Args:
+            seconds: How long to hold off
+        """
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.refill_rate)